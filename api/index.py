@@ -4,6 +4,7 @@ import sys
 from pathlib import Path
 import os
 import logging
+import threading
 
 # Set up basic logging to stderr (Vercel captures this)
 logging.basicConfig(
@@ -18,69 +19,108 @@ sys.path.insert(0, str(project_root))
 # Set Vercel environment variable for database path
 os.environ["VERCEL"] = "1"
 
-# Initialize app variable
-app = None
-
-# Try to import and initialize the app
-try:
-    logging.info("Starting app initialization...")
-    
-    # Don't initialize database at import time - let it happen lazily
-    logging.info("Skipping database init at import time (will initialize on first use)")
-    
-    # Import app (this may trigger more imports)
-    from longevity_map.api.main import app
-    logging.info("FastAPI app imported successfully")
-    
-except Exception as e:
-    logging.error(f"Error importing FastAPI app: {e}", exc_info=True)
-    # Create a minimal app as fallback
+# The FastAPI app and its Mangum adapter are built on first use rather than at
+# import time, so a cold start doesn't pay for the full import graph until a
+# request actually needs it. Both are reused across warm invocations.
+_app = None
+_asgi_handler = None
+_app_lock = threading.Lock()
+_asgi_lock = threading.Lock()
+
+
+def _create_fallback_app(error: Exception):
+    """Create a minimal app that reports why initialization failed."""
+    from fastapi import FastAPI
+    fallback = FastAPI(title="Longevity R&D Map API (Error Mode)")
+
+    @fallback.get("/")
+    def root():
+        return {
+            "error": "Failed to initialize application",
+            "details": str(error),
+            "type": type(error).__name__
+        }
+
+    @fallback.get("/health")
+    def health():
+        return {"status": "error", "message": str(error)}
+
+    logging.info("Created fallback FastAPI app")
+    return fallback
+
+
+def _get_app():
+    """Import the FastAPI app on first use, falling back to an error app."""
+    global _app
+    if _app is not None:
+        return _app
+
+    with _app_lock:
+        if _app is None:
+            _app = _load_app()
+    return _app
+
+
+def _load_app():
+    """Import the FastAPI app, or build the error-mode app if that fails."""
     try:
-        from fastapi import FastAPI
-        app = FastAPI(title="Longevity R&D Map API (Error Mode)")
-        
-        @app.get("/")
-        def root():
-            return {
-                "error": "Failed to initialize application",
-                "details": str(e),
-                "type": type(e).__name__
-            }
-        
-        @app.get("/health")
-        def health():
-            return {"status": "error", "message": str(e)}
-            
-        logging.info("Created fallback FastAPI app")
-    except Exception as fallback_error:
-        logging.error(f"Could not create fallback app: {fallback_error}", exc_info=True)
-        # Last resort - create a simple handler that returns error
-        def handler(request):
-            return {
-                "statusCode": 500,
-                "headers": {"Content-Type": "application/json"},
-                "body": {"error": "Application initialization failed", "details": str(e)}
-            }
-        __all__ = ['handler']
-        raise
+        logging.info("Starting app initialization...")
+
+        # Don't initialize database at import time - let it happen lazily
+        logging.info("Skipping database init at import time (will initialize on first use)")
+
+        # Import app (this may trigger more imports)
+        from longevity_map.api.main import app
+        logging.info("FastAPI app imported successfully")
+        return app
+    except Exception as e:
+        logging.error(f"Error importing FastAPI app: {e}", exc_info=True)
+        try:
+            return _create_fallback_app(e)
+        except Exception as fallback_error:
+            logging.error(f"Could not create fallback app: {fallback_error}", exc_info=True)
+            raise
+
+
+def _get_asgi_handler():
+    """Build the Mangum adapter once and reuse it across invocations."""
+    global _asgi_handler
+    if _asgi_handler is not None:
+        return _asgi_handler
+
+    app = _get_app()
+    with _asgi_lock:
+        if _asgi_handler is None:
+            from mangum import Mangum
+            _asgi_handler = Mangum(app, lifespan="off")
+    return _asgi_handler
+
+
+def _warm():
+    """Build the app, agents and database schema ahead of the first request."""
+    try:
+        _get_asgi_handler()
+        from longevity_map.database.session import ensure_db
+        ensure_db()
+        logging.info("Pre-warm completed")
+    except Exception as e:
+        logging.warning(f"Pre-warm failed, will initialize on first request: {e}")
+
+
+# Optionally pre-warm during the platform's init phase so the first request
+# doesn't pay for imports and agent construction
+if os.environ.get("LONGEVITY_MAP_PREWARM", "").lower() in ("1", "true", "yes"):
+    threading.Thread(target=_warm, name="prewarm", daemon=True).start()
+
 
 # Vercel expects a handler function
 def handler(request):
     """Vercel serverless handler."""
     try:
-        if app is None:
-            return {
-                "statusCode": 500,
-                "headers": {"Content-Type": "application/json"},
-                "body": {"error": "Application not initialized"}
-            }
-        
-        from mangum import Mangum
-        asgi_handler = Mangum(app, lifespan="off")
+        asgi_handler = _get_asgi_handler()
         return asgi_handler(request)
     except Exception as e:
         logging.error(f"Handler error: {e}", exc_info=True)
-        import traceback
         return {
             "statusCode": 500,
             "headers": {"Content-Type": "application/json"},
@@ -91,6 +131,13 @@ def handler(request):
             }
         }
 
+
+def __getattr__(name):
+    """Resolve ``app`` lazily so ``from api.index import app`` still works."""
+    if name == "app":
+        return _get_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 # Also export app directly for compatibility
 __all__ = ['app', 'handler']
-
@@ -1,11 +1,12 @@
 """Base agent class for all agents in the framework."""
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
-import yaml
+from typing import Any, Optional
 from pathlib import Path
 import logging
 
+from longevity_map.utils.config import default_config_path, load_config
+
 logger = logging.getLogger(__name__)
 
 
@@ -15,14 +16,11 @@ class BaseAgent(ABC):
     def __init__(self, config_path: Optional[Path] = None):
         """Initialize agent with configuration."""
         if config_path is None:
-            config_path = Path(__file__).parent.parent.parent / "config" / "config.yaml"
-            if not config_path.exists():
-                config_path = Path(__file__).parent.parent.parent / "config" / "config.example.yaml"
+            config_path = default_config_path()
         
         try:
             if config_path.exists():
-                with open(config_path, 'r') as f:
-                    self.config = yaml.safe_load(f) or {}
+                self.config = load_config(config_path)
             else:
                 self.config = {}
                 logger.warning(f"No config file found at {config_path}, using defaults")
@@ -1,64 +1,197 @@
 """Capability Extractor agent that identifies required tools, technologies, and methods."""
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, NamedTuple, Tuple
+from collections import defaultdict
+from functools import lru_cache
 from longevity_map.models.capability import Capability, CapabilityType
 from longevity_map.agents.base_agent import BaseAgent
-from longevity_map.utils.llm import LLMHelper
+from longevity_map.utils.llm import get_llm_helper
 import re
 
+# google-re2 is optional: it matches the fused capability pattern with a
+# linear-time automaton instead of the backtracking stdlib engine
+try:
+    import re2 as _fused_re
+except ImportError:
+    _fused_re = re
+
+
+# Capability type lookup by value, e.g. "measurement_tool"
+_CAPABILITY_TYPES = {cap_type.value: cap_type for cap_type in CapabilityType}
+
+_TOKEN_RE = re.compile(r"\w+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Complete noun phrases preferred as capability names, e.g.
+# "single-cell RNA sequencing" or "mouse model" (matched against lowercased text)
+_NAME_PATTERNS = tuple(re.compile(p) for p in (
+    r'(?:single-cell|bulk|spatial)\s+(?:rna|dna|atac)\s+sequencing',
+    r'(?:mouse|rat|zebrafish)\s+model(?:s)?',
+    r'(?:flow\s+)?cytometry',
+    r'mass\s+spectrometry',
+    r'(?:confocal|fluorescence|electron)\s+microscopy',
+    r'(?:crispr|gene\s+editing)',
+    r'(?:proteomic|transcriptomic|genomic)\s+dataset',
+    r'organoid(?:s)?',
+    r'cell\s+line(?:s)?',
+))
+
+
+class _CapabilityHit(NamedTuple):
+    """Lightweight pattern match, turned into a Capability after deduplication."""
+    name: str
+    type: CapabilityType
+    context_start: int
+    context_end: int
+
+
+def _fuse_patterns(patterns_by_type: Dict[CapabilityType, List[str]]) -> Dict[CapabilityType, "re.Pattern[str]"]:
+    """
+    Compile each type's regex list into one alternation.
+    
+    Patterns are lowercase and matched against lowercased text, so no
+    case-insensitive flag is needed. Uses google-re2 when installed. Types
+    are kept in separate patterns because finditer only returns
+    non-overlapping matches: one alternation across types would let an
+    earlier type's match (e.g. "machine learning") hide a later type's
+    match on the same words (e.g. "machine").
+    """
+    return {
+        cap_type: _fused_re.compile("|".join(f"(?:{p})" for p in patterns))
+        for cap_type, patterns in patterns_by_type.items()
+    }
+
+
+# Description keywords that bump estimated cost and time
+_COMPLEXITY_KEYWORDS = frozenset({"complex", "advanced", "novel", "cutting-edge"})
+# Case-insensitive so descriptions can be searched without a lowercased copy
+_COMPLEXITY_KEYWORDS_RE = re.compile(
+    "|".join(re.escape(k) for k in sorted(_COMPLEXITY_KEYWORDS)), re.IGNORECASE
+)
+
+
+@lru_cache(maxsize=128)
+def _base_requirements(cap_type: CapabilityType, is_complex: bool) -> Tuple[float, int]:
+    """Estimated cost (USD) and time (months) for a capability type."""
+    # Simple heuristics based on type
+    base_costs = {
+        CapabilityType.MEASUREMENT_TOOL: (50000, 6),
+        CapabilityType.MODEL_SYSTEM: (100000, 12),
+        CapabilityType.DATASET: (20000, 3),
+        CapabilityType.COMPUTATIONAL_METHOD: (50000, 6),
+        CapabilityType.SOFTWARE: (100000, 12),
+        CapabilityType.HARDWARE: (200000, 18),
+        CapabilityType.PROTOCOL: (10000, 2),
+        CapabilityType.INFRASTRUCTURE: (500000, 24),
+    }
+    
+    cost, time = base_costs.get(cap_type, (50000, 6))
+    if is_complex:
+        cost *= 1.5
+        time *= 1.3
+    
+    return cost, time
+
+
+@lru_cache(maxsize=128)
+def _base_complexity(cap_type: CapabilityType, long_description: bool) -> float:
+    """Complexity score (0-1) for a capability type."""
+    base_complexity = {
+        CapabilityType.MEASUREMENT_TOOL: 0.5,
+        CapabilityType.MODEL_SYSTEM: 0.7,
+        CapabilityType.DATASET: 0.3,
+        CapabilityType.COMPUTATIONAL_METHOD: 0.6,
+        CapabilityType.SOFTWARE: 0.6,
+        CapabilityType.HARDWARE: 0.8,
+        CapabilityType.PROTOCOL: 0.4,
+        CapabilityType.INFRASTRUCTURE: 0.9,
+    }
+    
+    complexity = base_complexity.get(cap_type, 0.5)
+    if long_description:
+        complexity = min(1.0, complexity + 0.1)
+    
+    return complexity
+
+
+def _numeric_field(value: Any, default: float) -> float:
+    """Return an LLM-provided number, or default if it is missing, non-numeric or NaN."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and value == value:
+        return value
+    return default
+
+
+def _anchor_token(name: str) -> Optional[str]:
+    """
+    Longest word of name that is a whole word in any text containing name.
+    
+    Names are cut from fixed windows, so their first and last words may be
+    fragments ("oughput", "scre"); only words with a non-word character on
+    both sides inside name qualify.
+    """
+    words = [
+        match.group() for match in _TOKEN_RE.finditer(name)
+        if 0 < match.start() and match.end() < len(name)
+    ]
+    return max(words, key=len) if words else None
+
 
 class CapabilityExtractor(BaseAgent):
     """Extracts required capabilities from problem descriptions."""
     
+    # Patterns for different capability types (lowercase, matched against lowercased text)
+    capability_patterns = {
+        CapabilityType.MEASUREMENT_TOOL: [
+            r"(?:single-cell|bulk|spatial)\s+(?:rna|dna|atac)\s+sequencing",
+            r"flow\s+cytometry",
+            r"mass\s+spectrometry",
+            r"(?:confocal|fluorescence|electron|super-resolution)\s+microscopy",
+            r"qpcr|rt-pcr|pcr",
+            r"western\s+blot",
+            r"elisa",
+            r"immunofluorescence",
+            r"sequencing\s+platform",
+            r"measurement\s+(?:tool|method|technique)",
+            r"assay", r"detection", r"quantification", r"imaging",
+        ],
+        CapabilityType.MODEL_SYSTEM: [
+            r"(?:mouse|rat|zebrafish|drosophila)\s+model",
+            r"animal\s+model",
+            r"cell\s+line",
+            r"organoid(?:s)?",
+            r"ipsc",
+            r"stem\s+cell",
+            r"in\s+vitro\s+model",
+            r"in\s+vivo\s+model",
+        ],
+        CapabilityType.DATASET: [
+            r"(?:proteomic|transcriptomic|genomic|metabolomic)\s+dataset",
+            r"omics\s+data",
+            r"database",
+            r"repository",
+            r"public\s+dataset",
+        ],
+        CapabilityType.COMPUTATIONAL_METHOD: [
+            r"algorithm", r"computational", r"machine learning",
+            r"modeling", r"simulation", r"prediction"
+        ],
+        CapabilityType.SOFTWARE: [
+            r"software", r"tool", r"platform", r"pipeline"
+        ],
+        CapabilityType.HARDWARE: [
+            r"equipment", r"instrument", r"device", r"machine"
+        ],
+        CapabilityType.PROTOCOL: [
+            r"protocol", r"method", r"procedure", r"standard"
+        ],
+    }
+    # Each type's patterns fused into one alternation, so the text is
+    # scanned once per type rather than once per pattern
+    capability_regexes = _fuse_patterns(capability_patterns)
+    
     def __init__(self, config_path=None):
         super().__init__(config_path)
-        self.llm = LLMHelper(config_path)
-        # Patterns for different capability types
-        self.capability_patterns = {
-            CapabilityType.MEASUREMENT_TOOL: [
-                r"(?:single-cell|bulk|spatial)\s+(?:RNA|DNA|ATAC)\s+sequencing",
-                r"flow\s+cytometry",
-                r"mass\s+spectrometry",
-                r"(?:confocal|fluorescence|electron|super-resolution)\s+microscopy",
-                r"qPCR|RT-PCR|PCR",
-                r"western\s+blot",
-                r"ELISA",
-                r"immunofluorescence",
-                r"sequencing\s+platform",
-                r"measurement\s+(?:tool|method|technique)",
-                r"assay", r"detection", r"quantification", r"imaging",
-            ],
-            CapabilityType.MODEL_SYSTEM: [
-                r"(?:mouse|rat|zebrafish|drosophila)\s+model",
-                r"animal\s+model",
-                r"cell\s+line",
-                r"organoid(?:s)?",
-                r"iPSC",
-                r"stem\s+cell",
-                r"in\s+vitro\s+model",
-                r"in\s+vivo\s+model",
-            ],
-            CapabilityType.DATASET: [
-                r"(?:proteomic|transcriptomic|genomic|metabolomic)\s+dataset",
-                r"omics\s+data",
-                r"database",
-                r"repository",
-                r"public\s+dataset",
-            ],
-            CapabilityType.COMPUTATIONAL_METHOD: [
-                r"algorithm", r"computational", r"machine learning",
-                r"modeling", r"simulation", r"prediction"
-            ],
-            CapabilityType.SOFTWARE: [
-                r"software", r"tool", r"platform", r"pipeline"
-            ],
-            CapabilityType.HARDWARE: [
-                r"equipment", r"instrument", r"device", r"machine"
-            ],
-            CapabilityType.PROTOCOL: [
-                r"protocol", r"method", r"procedure", r"standard"
-            ],
-        }
+        self.llm = get_llm_helper(config_path)
     
     def process(self, problem_text: str, problem_id: Optional[int] = None) -> List[Capability]:
         """
@@ -67,7 +200,7 @@ class CapabilityExtractor(BaseAgent):
         Args:
             problem_text: Problem description
             problem_id: Optional problem ID for tracking
-            
+        
         Returns:
             List of Capability objects
         """
@@ -81,23 +214,14 @@ class CapabilityExtractor(BaseAgent):
                     for cap_data in llm_caps:
                         try:
                             # Validate and convert type
-                            cap_type_str = cap_data.get("type", "other").lower()
-                            # Map common variations
-                            type_mapping = {
-                                "measurement_tool": CapabilityType.MEASUREMENT_TOOL,
-                                "model_system": CapabilityType.MODEL_SYSTEM,
-                                "dataset": CapabilityType.DATASET,
-                                "computational_method": CapabilityType.COMPUTATIONAL_METHOD,
-                                "software": CapabilityType.SOFTWARE,
-                                "hardware": CapabilityType.HARDWARE,
-                                "protocol": CapabilityType.PROTOCOL,
-                                "infrastructure": CapabilityType.INFRASTRUCTURE,
-                            }
-                            cap_type = type_mapping.get(cap_type_str, CapabilityType.OTHER)
+                            cap_type_str = cap_data.get("type") or "other"
+                            cap_type = _CAPABILITY_TYPES.get(cap_type_str) or _CAPABILITY_TYPES.get(
+                                cap_type_str.lower(), CapabilityType.OTHER
+                            )
                             
                             cap = Capability(
-                                name=cap_data.get("name", "Unknown").strip(),
-                                description=cap_data.get("description", "").strip(),
+                                name=(cap_data.get("name") or "Unknown").strip(),
+                                description=(cap_data.get("description") or "").strip(),
                                 type=cap_type,
                                 estimated_cost=cap_data.get("estimated_cost_usd") or cap_data.get("estimated_cost"),
                                 estimated_time=cap_data.get("estimated_time_months") or cap_data.get("estimated_time"),
@@ -115,12 +239,18 @@ class CapabilityExtractor(BaseAgent):
         # Fallback to pattern-based extraction if LLM didn't find anything
         if not capabilities:
             text_lower = problem_text.lower()
-            for cap_type, patterns in self.capability_patterns.items():
-                matches = self._find_capabilities(text_lower, patterns, cap_type)
-                capabilities.extend(matches)
+            hits = self._find_capabilities(text_lower)
             
-            # Remove duplicates
-            capabilities = self._deduplicate_capabilities(capabilities)
+            # Remove duplicates before building any model objects
+            hits = self._deduplicate_capabilities(hits)
+            capabilities = [
+                Capability(
+                    name=hit.name,
+                    description=text_lower[hit.context_start:hit.context_end].strip(),
+                    type=hit.type
+                )
+                for hit in hits
+            ]
             
             # Estimate cost and time
             for cap in capabilities:
@@ -133,76 +263,57 @@ class CapabilityExtractor(BaseAgent):
     
     def _estimate_complexity_from_data(self, cap_data: Dict[str, Any]) -> float:
         """Estimate complexity from LLM-extracted data."""
-        # Use cost and time as proxies for complexity
-        cost = cap_data.get("estimated_cost_usd", 50000)
-        time = cap_data.get("estimated_time_months", 6)
+        # Use cost and time as proxies for complexity; the LLM may emit nulls
+        cost = _numeric_field(cap_data.get("estimated_cost_usd"), 50000)
+        time = _numeric_field(cap_data.get("estimated_time_months"), 6)
         
         # Normalize to 0-1 scale
-        cost_score = min(1.0, cost / 1_000_000)
-        time_score = min(1.0, time / 60)
+        cost_score = min(1.0, max(0.0, cost / 1_000_000))
+        time_score = min(1.0, max(0.0, time / 60))
         
         return (cost_score + time_score) / 2
     
-    def _find_capabilities(self, text: str, patterns: List[str], cap_type: CapabilityType) -> List[Capability]:
-        """Find capabilities matching patterns."""
-        capabilities = []
+    def _find_capabilities(self, text: str) -> List[_CapabilityHit]:
+        """Find capabilities of every type, scanning the text once per type."""
+        # Collect match spans first, then extract names from their context
+        spans = [
+            (cap_type, match.start(), match.end())
+            for cap_type, regex in self.capability_regexes.items()
+            for match in regex.finditer(text)
+        ]
         
-        for pattern in patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                # Extract surrounding context as capability name
-                start = max(0, match.start() - 50)
-                end = min(len(text), match.end() + 50)
-                context = text[start:end]
-                
-                # Try to extract a meaningful name
-                name = self._extract_capability_name(context, match.group())
-                description = context.strip()
-                
-                if name and len(name) > 3:  # Filter out very short names
-                    cap = Capability(
-                        name=name,
-                        description=description,
-                        type=cap_type
-                    )
-                    capabilities.append(cap)
+        hits = []
+        for cap_type, match_start, match_end in spans:
+            # Extract surrounding context as capability name
+            start = max(0, match_start - 50)
+            end = min(len(text), match_end + 50)
+            context = text[start:end]
+            
+            # Try to extract a meaningful name
+            name = self._extract_capability_name(context, text[match_start:match_end])
+            
+            if name and len(name) > 3:  # Filter out very short names
+                hits.append(_CapabilityHit(name, cap_type, start, end))
         
-        return capabilities
+        return hits
     
     def _extract_capability_name(self, context: str, matched_text: str) -> str:
-        """Extract a meaningful capability name from context."""
+        """Extract a meaningful capability name from already-lowercased context."""
         # Improved extraction: look for complete noun phrases
-        import re
-        
-        # Try to find complete phrases like "single-cell RNA sequencing", "mouse model", etc.
-        # Common patterns for capabilities
-        patterns = [
-            r'(?:single-cell|bulk|spatial)\s+(?:RNA|DNA|ATAC)\s+sequencing',
-            r'(?:mouse|rat|zebrafish)\s+model(?:s)?',
-            r'(?:flow\s+)?cytometry',
-            r'mass\s+spectrometry',
-            r'(?:confocal|fluorescence|electron)\s+microscopy',
-            r'(?:CRISPR|gene\s+editing)',
-            r'(?:proteomic|transcriptomic|genomic)\s+dataset',
-            r'organoid(?:s)?',
-            r'cell\s+line(?:s)?',
-        ]
-        
-        context_lower = context.lower()
-        for pattern in patterns:
-            match = re.search(pattern, context_lower, re.IGNORECASE)
+        for pattern in _NAME_PATTERNS:
+            match = pattern.search(context)
             if match:
                 # Extract the matched phrase and surrounding context
                 start = max(0, match.start() - 20)
                 end = min(len(context), match.end() + 20)
                 phrase = context[start:end].strip()
                 # Clean up
-                phrase = re.sub(r'\s+', ' ', phrase)
+                phrase = _WHITESPACE_RE.sub(' ', phrase)
                 return phrase[:100]  # Limit length
         
         # Fallback to original method
         words = context.split()
-        match_idx = context_lower.find(matched_text.lower())
+        match_idx = context.find(matched_text)
         if match_idx == -1:
             return matched_text
         
@@ -222,74 +333,54 @@ class CapabilityExtractor(BaseAgent):
         
         return name.strip()
     
-    def _deduplicate_capabilities(self, capabilities: List[Capability]) -> List[Capability]:
+    def _deduplicate_capabilities(self, capabilities: List[_CapabilityHit]) -> List[_CapabilityHit]:
         """Remove duplicate capabilities based on name similarity."""
         if not capabilities:
             return []
         
         unique = []
         seen_names = set()
+        # A name is a duplicate if it contains, or is contained in, a kept name.
+        # Indexes narrow the substring checks to kept names sharing a word:
+        # token -> kept names with that word, and anchor -> kept names whose
+        # anchor token is that word (names without one are always checked)
+        token_index: Dict[str, List[str]] = defaultdict(list)
+        anchor_index: Dict[str, List[str]] = defaultdict(list)
+        unanchored: List[str] = []
         
         for cap in capabilities:
-            # Simple deduplication: check if name is very similar
             name_lower = cap.name.lower()
-            is_duplicate = False
+            if name_lower in seen_names:
+                continue
             
-            for seen_name in seen_names:
-                # Check if names are very similar (simple heuristic)
-                if name_lower in seen_name or seen_name in name_lower:
-                    is_duplicate = True
-                    break
+            tokens = set(_TOKEN_RE.findall(name_lower))
+            anchor = _anchor_token(name_lower)
+            # A kept name containing this one has its anchor as a word
+            containing = token_index.get(anchor, ()) if anchor else seen_names
+            # A kept name inside this one has its anchor among this one's words
+            contained = unanchored + [other for token in tokens for other in anchor_index.get(token, ())]
+            if (any(name_lower in other for other in containing)
+                    or any(other in name_lower for other in contained)):
+                continue
             
-            if not is_duplicate:
-                unique.append(cap)
-                seen_names.add(name_lower)
+            unique.append(cap)
+            seen_names.add(name_lower)
+            for token in tokens:
+                token_index[token].append(name_lower)
+            if anchor:
+                anchor_index[anchor].append(name_lower)
+            else:
+                unanchored.append(name_lower)
         
         return unique
     
     def _estimate_requirements(self, capability: Capability) -> tuple[float, int]:
         """Estimate cost (USD) and time (months) for a capability."""
-        # Simple heuristics based on type
-        base_costs = {
-            CapabilityType.MEASUREMENT_TOOL: (50000, 6),
-            CapabilityType.MODEL_SYSTEM: (100000, 12),
-            CapabilityType.DATASET: (20000, 3),
-            CapabilityType.COMPUTATIONAL_METHOD: (50000, 6),
-            CapabilityType.SOFTWARE: (100000, 12),
-            CapabilityType.HARDWARE: (200000, 18),
-            CapabilityType.PROTOCOL: (10000, 2),
-            CapabilityType.INFRASTRUCTURE: (500000, 24),
-        }
-        
-        cost, time = base_costs.get(capability.type, (50000, 6))
-        
         # Adjust based on complexity keywords
-        desc_lower = capability.description.lower()
-        if any(word in desc_lower for word in ["complex", "advanced", "novel", "cutting-edge"]):
-            cost *= 1.5
-            time *= 1.3
-        
-        return cost, time
+        is_complex = _COMPLEXITY_KEYWORDS_RE.search(capability.description) is not None
+        return _base_requirements(capability.type, is_complex)
     
     def _estimate_complexity(self, capability: Capability) -> float:
         """Estimate complexity score (0-1)."""
         # Simple heuristic based on type and description length
-        base_complexity = {
-            CapabilityType.MEASUREMENT_TOOL: 0.5,
-            CapabilityType.MODEL_SYSTEM: 0.7,
-            CapabilityType.DATASET: 0.3,
-            CapabilityType.COMPUTATIONAL_METHOD: 0.6,
-            CapabilityType.SOFTWARE: 0.6,
-            CapabilityType.HARDWARE: 0.8,
-            CapabilityType.PROTOCOL: 0.4,
-            CapabilityType.INFRASTRUCTURE: 0.9,
-        }
-        
-        complexity = base_complexity.get(capability.type, 0.5)
-        
-        # Adjust based on description
-        if len(capability.description) > 500:
-            complexity = min(1.0, complexity + 0.1)
-        
-        return complexity
-
+        return _base_complexity(capability.type, len(capability.description) > 500)
@@ -1,13 +1,106 @@
 """Funding/Impact Agent that predicts which gaps matter most and attract capital."""
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, NamedTuple, Optional, Tuple
+from bisect import bisect_left, bisect_right
 from longevity_map.agents.base_agent import BaseAgent
 from longevity_map.models.gap import Gap
 from longevity_map.database.session import SessionLocal
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy.orm import Session, raiseload
+from sqlalchemy import case, desc, func, select
+# numpy is optional - scoring falls back to plain Python without it
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
 
 
+class _Buckets(NamedTuple):
+    """Factor lookup table: factors[i] applies between edges[i-1] and edges[i]."""
+    edges: Tuple[float, ...]
+    factors: Tuple[float, ...]
+    # Whether a value equal to an edge falls in the bucket below it
+    upper_inclusive: bool = False
+
+
+# Scoring constants shared by every scoring path (SQL ranking, numpy and plain
+# Python), so the ranking can't drift from the reported scores
+
+# Impact grows linearly up to this many blocked problems
+_IMPACT_FULL_AT = 20
+_IMPACT_MAX = 0.3
+# Cost per blocked problem; <$1M per problem is good
+_COST_EFFICIENCY = _Buckets((1_000_000, 5_000_000), (0.2, 0.1, 0.05))
+# Blocked research value
+_MARKET_SIZE = _Buckets((10_000_000, 100_000_000), (0.1, 0.2, 0.3))
+# Estimated months; <= 1 year is best
+_FEASIBILITY = _Buckets((12, 24), (0.2, 0.15, 0.1), upper_inclusive=True)
+
+
+def _as_list(column) -> list:
+    """A factor column as a plain list (numpy arrays are converted in one call)."""
+    return column.tolist() if hasattr(column, "tolist") else column
+
+
+def _bucket_factor(value: float, buckets: _Buckets) -> float:
+    """Factor for the bucket value falls in."""
+    find = bisect_left if buckets.upper_inclusive else bisect_right
+    return buckets.factors[find(buckets.edges, value)]
+
+
+def _bucket_factors_np(values, buckets: _Buckets):
+    """Factor for the bucket each value of an array falls in."""
+    return np.take(buckets.factors, np.digitize(values, buckets.edges, right=buckets.upper_inclusive))
+
+
+def _bucket_sql(value, buckets: _Buckets):
+    """SQL CASE picking the factor for the bucket value falls in."""
+    whens = [
+        ((value <= edge) if buckets.upper_inclusive else (value < edge), factor)
+        for edge, factor in zip(buckets.edges, buckets.factors)
+    ]
+    return case(*whens, else_=buckets.factors[-1])
+
+
+def _attractiveness_score_sql():
+    """
+    SQL expression for the attractiveness score of a gap.
+    
+    Mirrors predict_funding_attractiveness_batch term for term (same order
+    of additions), so ordering by it ranks gaps exactly as the Python scores do.
+    """
+    num_blocked = func.coalesce(Gap.num_blocked_problems, 0)
+    cost = func.coalesce(Gap.estimated_cost, 0)
+    value = func.coalesce(Gap.blocked_research_value, 0)
+    time = func.coalesce(Gap.estimated_time, 0)
+    
+    has_problems = num_blocked > 0
+    
+    # Impact factor (0-0.3)
+    raw_impact = num_blocked / float(_IMPACT_FULL_AT) * _IMPACT_MAX
+    impact = case((~has_problems, 0.0), (raw_impact < _IMPACT_MAX, raw_impact), else_=_IMPACT_MAX)
+    
+    # Cost efficiency (0-0.2)
+    cost_factor = case(
+        ((cost == 0) | ~has_problems, 0.0),
+        else_=_bucket_sql(cost / num_blocked, _COST_EFFICIENCY)
+    )
+    
+    # Market size (0-0.3)
+    market_factor = case(
+        (value == 0, 0.0),
+        else_=_bucket_sql(value, _MARKET_SIZE)
+    )
+    
+    # Technical feasibility (0-0.2)
+    feasibility_factor = case(
+        (time == 0, 0.0),
+        else_=_bucket_sql(time, _FEASIBILITY)
+    )
+    
+    total = impact + cost_factor + market_factor + feasibility_factor
+    return case((total < 1.0, total), else_=1.0)
+
 class FundingAgent(BaseAgent):
     """Predicts funding attractiveness and impact of gaps."""
     
@@ -18,7 +111,7 @@ class FundingAgent(BaseAgent):
         Args:
             gap: Gap to analyze
             db: Database session
-            
+        
         Returns:
             Dict with funding predictions
         """
@@ -31,67 +124,125 @@ class FundingAgent(BaseAgent):
         Args:
             gap: Gap to analyze
             db: Database session
-            
+        
         Returns:
             Dict with funding predictions
         """
+        return self.predict_funding_attractiveness_batch([gap], db)[0]
+    
+    def predict_funding_attractiveness_batch(self, gaps: List[Gap], db: Session) -> List[Dict[str, Any]]:
+        """
+        Predict funding attractiveness for several gaps at once.
+        
+        Args:
+            gaps: Gaps to analyze
+            db: Database session
+        
+        Returns:
+            List of dicts with funding predictions, aligned with gaps
+        """
         # Factors that make gaps attractive for funding:
         # 1. High impact (many blocked problems)
         # 2. Reasonable cost
         # 3. Clear market need
         # 4. Technical feasibility
+        if not gaps:
+            return []
         
-        attractiveness_score = 0.0
-        factors = {}
+        # Plain Python lists: indexing numpy arrays per element boxes a
+        # numpy scalar each time, which costs more than the math itself
+        factor_columns = [
+            (name, _as_list(values), _as_list(present))
+            for name, (values, present) in self._funding_factors(gaps).items()
+        ]
+        
+        predictions = []
+        for i, gap in enumerate(gaps):
+            factors = {
+                name: values[i]
+                for name, values, present in factor_columns
+                if present[i]
+            }
+            attractiveness_score = 0.0
+            for value in factors.values():
+                attractiveness_score += value
+            
+            predictions.append({
+                "gap_id": gap.id,
+                "attractiveness_score": min(1.0, attractiveness_score),
+                "factors": factors,
+                "predicted_funding_likelihood": "high" if attractiveness_score >= 0.7 else 
+                                               "medium" if attractiveness_score >= 0.4 else "low"
+            })
+        
+        return predictions
+    
+    def _funding_factors(self, gaps: List[Gap]) -> Dict[str, Any]:
+        """Compute each factor for all gaps: name -> (values, present) columns."""
+        if NUMPY_AVAILABLE:
+            return self._funding_factors_vectorized(gaps)
+        return self._funding_factors_scalar(gaps)
+    
+    def _funding_factors_vectorized(self, gaps: List[Gap]) -> Dict[str, Any]:
+        """Compute each factor for all gaps with array operations."""
+        num_blocked = np.array([g.num_blocked_problems or 0 for g in gaps], dtype=float)
+        cost = np.array([g.estimated_cost or 0 for g in gaps], dtype=float)
+        value = np.array([g.blocked_research_value or 0 for g in gaps], dtype=float)
+        time = np.array([g.estimated_time or 0 for g in gaps], dtype=float)
+        
+        has_problems = num_blocked > 0
         
         # Impact factor (0-0.3)
-        if gap.num_blocked_problems > 0:
-            impact_factor = min(0.3, gap.num_blocked_problems / 20 * 0.3)
-            attractiveness_score += impact_factor
-            factors["impact"] = impact_factor
+        impact = np.minimum(_IMPACT_MAX, num_blocked / _IMPACT_FULL_AT * _IMPACT_MAX)
         
         # Cost efficiency (0-0.2)
-        if gap.estimated_cost and gap.num_blocked_problems > 0:
-            cost_per_problem = gap.estimated_cost / gap.num_blocked_problems
-            if cost_per_problem < 1_000_000:  # <$1M per problem is good
-                cost_factor = 0.2
-            elif cost_per_problem < 5_000_000:
-                cost_factor = 0.1
-            else:
-                cost_factor = 0.05
-            attractiveness_score += cost_factor
-            factors["cost_efficiency"] = cost_factor
+        cost_per_problem = np.divide(cost, num_blocked, out=np.full_like(cost, np.inf), where=has_problems)
+        cost_factor = _bucket_factors_np(cost_per_problem, _COST_EFFICIENCY)
         
         # Market size (0-0.3)
-        if gap.blocked_research_value:
-            if gap.blocked_research_value >= 100_000_000:
-                market_factor = 0.3
-            elif gap.blocked_research_value >= 10_000_000:
-                market_factor = 0.2
-            else:
-                market_factor = 0.1
-            attractiveness_score += market_factor
-            factors["market_size"] = market_factor
+        market_factor = _bucket_factors_np(value, _MARKET_SIZE)
         
         # Technical feasibility (0-0.2)
-        if gap.estimated_time:
-            if gap.estimated_time <= 12:  # <= 1 year
-                feasibility_factor = 0.2
-            elif gap.estimated_time <= 24:
-                feasibility_factor = 0.15
-            else:
-                feasibility_factor = 0.1
-            attractiveness_score += feasibility_factor
-            factors["feasibility"] = feasibility_factor
+        feasibility_factor = _bucket_factors_np(time, _FEASIBILITY)
         
         return {
-            "gap_id": gap.id,
-            "attractiveness_score": min(1.0, attractiveness_score),
-            "factors": factors,
-            "predicted_funding_likelihood": "high" if attractiveness_score >= 0.7 else 
-                                           "medium" if attractiveness_score >= 0.4 else "low"
+            "impact": (impact, has_problems),
+            "cost_efficiency": (cost_factor, (cost != 0) & has_problems),
+            "market_size": (market_factor, value != 0),
+            "feasibility": (feasibility_factor, time != 0),
         }
     
+    def _funding_factors_scalar(self, gaps: List[Gap]) -> Dict[str, Any]:
+        """Compute each factor per gap in plain Python (used without numpy)."""
+        columns = {name: ([], []) for name in ("impact", "cost_efficiency", "market_size", "feasibility")}
+        
+        def add(name, value, present):
+            columns[name][0].append(value)
+            columns[name][1].append(present)
+        
+        for gap in gaps:
+            num_blocked = gap.num_blocked_problems or 0
+            
+            # Impact factor (0-0.3)
+            add("impact", min(_IMPACT_MAX, num_blocked / _IMPACT_FULL_AT * _IMPACT_MAX), num_blocked > 0)
+            
+            # Cost efficiency (0-0.2)
+            if gap.estimated_cost and num_blocked > 0:
+                cost_per_problem = gap.estimated_cost / num_blocked
+                add("cost_efficiency", _bucket_factor(cost_per_problem, _COST_EFFICIENCY), True)
+            else:
+                add("cost_efficiency", 0.0, False)
+            
+            # Market size (0-0.3)
+            value = gap.blocked_research_value or 0
+            add("market_size", _bucket_factor(value, _MARKET_SIZE), bool(value))
+            
+            # Technical feasibility (0-0.2)
+            time = gap.estimated_time or 0
+            add("feasibility", _bucket_factor(time, _FEASIBILITY), bool(time))
+        
+        return columns
+    
     def rank_gaps_by_funding_potential(self, db: Session, top_n: int = 20) -> List[Dict[str, Any]]:
         """
         Rank gaps by funding potential.
@@ -99,15 +250,22 @@ class FundingAgent(BaseAgent):
         Args:
             db: Database session
             top_n: Number of top gaps to return
-            
+        
         Returns:
             List of gap info with funding predictions
         """
-        gaps = db.query(Gap).order_by(desc(Gap.impact_score)).limit(top_n * 2).all()
+        # Scored and ordered by the database so only the top gaps are loaded;
+        # ties keep impact order. raiseload turns any accidental relationship
+        # access into an error instead of a query per gap
+        top_gaps = db.execute(
+            select(Gap)
+            .options(raiseload('*'))
+            .order_by(desc(_attractiveness_score_sql()), desc(Gap.impact_score), Gap.id)
+            .limit(top_n)
+        ).scalars().all()
         
         ranked = []
-        for gap in gaps:
-            funding_info = self.predict_funding_attractiveness(gap, db)
+        for gap, funding_info in zip(top_gaps, self.predict_funding_attractiveness_batch(top_gaps, db)):
             ranked.append({
                 **funding_info,
                 "gap": {
@@ -119,8 +277,4 @@ class FundingAgent(BaseAgent):
                 }
             })
         
-        # Sort by attractiveness score
-        ranked.sort(key=lambda x: x["attractiveness_score"], reverse=True)
-        
-        return ranked[:top_n]
-
+        return ranked
@@ -6,7 +6,7 @@ from longevity_map.models.capability import Capability
 from longevity_map.agents.base_agent import BaseAgent
 from longevity_map.database.session import SessionLocal
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
 
 
 class GapAnalyzer(BaseAgent):
@@ -30,25 +30,55 @@ class GapAnalyzer(BaseAgent):
         Returns:
             Gap object if capability is missing, None otherwise
         """
-        # Check if capability has any matching resources
-        from longevity_map.models.mapping import CapabilityResourceMapping
-        
-        has_resources = db.query(CapabilityResourceMapping).filter(
-            CapabilityResourceMapping.capability_id == capability.id,
-            CapabilityResourceMapping.match_score >= 0.7
-        ).first() is not None
-        
-        if has_resources:
-            return None  # Not a gap, resources exist
-        
-        # Count blocked problems
-        from longevity_map.models.mapping import ProblemCapabilityMapping
+        return self.process_batch([capability], db)[0]
+    
+    def process_batch(self, capabilities: List[Capability], db: Session) -> List[Optional[Gap]]:
+        """
+        Analyze several capabilities with two aggregate queries in total.
         
-        num_blocked = db.query(ProblemCapabilityMapping).filter(
-            ProblemCapabilityMapping.capability_id == capability.id,
+        Args:
+            capabilities: Capabilities to analyze
+            db: Database session
+            
+        Returns:
+            List aligned with capabilities: Gap object if missing, None otherwise
+        """
+        if not capabilities:
+            return []
+        
+        from longevity_map.models.mapping import CapabilityResourceMapping, ProblemCapabilityMapping
+        
+        cap_ids = [capability.id for capability in capabilities]
+        
+        # Capabilities that have any matching resources
+        has_resources = {
+            capability_id for (capability_id,) in db.query(
+                CapabilityResourceMapping.capability_id
+            ).filter(
+                CapabilityResourceMapping.capability_id.in_(cap_ids),
+                CapabilityResourceMapping.match_score >= 0.7
+            ).distinct()
+        }
+        
+        # Count blocked problems per capability
+        blocked_counts = dict(db.query(
+            ProblemCapabilityMapping.capability_id,
+            func.count()
+        ).filter(
+            ProblemCapabilityMapping.capability_id.in_(cap_ids),
             ProblemCapabilityMapping.is_required == 1
-        ).count()
-        
+        ).group_by(
+            ProblemCapabilityMapping.capability_id
+        ).all())
+        
+        return [
+            None if capability.id in has_resources  # Not a gap, resources exist
+            else self._build_gap(capability, blocked_counts.get(capability.id, 0))
+            for capability in capabilities
+        ]
+    
+    def _build_gap(self, capability: Capability, num_blocked: int) -> Gap:
+        """Create a Gap for a capability that has no matching resources."""
         # Estimate blocked research value (simple heuristic)
         blocked_value = num_blocked * 2_000_000  # $2M per problem on average
         
@@ -119,31 +149,35 @@ class GapAnalyzer(BaseAgent):
         """
         from longevity_map.models.mapping import ProblemCapabilityMapping
         
-        # Get capabilities with most problems
-        results = db.query(
+        # Get capabilities with most problems. The count is served from the
+        # (capability_id, problem_id) index on the mapping table, which must
+        # exist for the database to avoid reading the table itself.
+        num_problems = func.count(ProblemCapabilityMapping.problem_id)
+        query = select(
             Capability.id,
             Capability.name,
             Capability.description,
             Capability.type,
-            func.count(ProblemCapabilityMapping.problem_id).label('num_problems')
+            num_problems.label('num_problems')
         ).join(
             ProblemCapabilityMapping,
             Capability.id == ProblemCapabilityMapping.capability_id
         ).group_by(
             Capability.id
         ).order_by(
-            func.count(ProblemCapabilityMapping.problem_id).desc()
-        ).limit(top_n).all()
-        
-        keystones = []
-        for result in results:
-            keystones.append({
-                "capability_id": result.id,
-                "name": result.name,
-                "description": result.description,
-                "type": result.type.value,
-                "num_problems": result.num_problems,
-            })
+            num_problems.desc()
+        ).limit(top_n)
+        
+        keystones = [
+            {
+                "capability_id": row.id,
+                "name": row.name,
+                "description": row.description,
+                "type": row.type.value,
+                "num_problems": row.num_problems,
+            }
+            for row in db.execute(query)
+        ]
         
         return keystones
 
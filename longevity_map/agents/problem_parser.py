@@ -4,16 +4,25 @@ from typing import List, Dict, Any, Optional
 from longevity_map.models.problem import Problem, ProblemCategory
 from longevity_map.agents.base_agent import BaseAgent
 from longevity_map.database.session import SessionLocal
-from longevity_map.utils.llm import LLMHelper
+from longevity_map.utils.llm import get_llm_helper
 import re
 
+# pyahocorasick is optional: it finds every category keyword in a single pass
+# over the text instead of one substring scan per keyword
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+_SENTENCE_SPLIT_RE = re.compile(r'[.!?]\s+')
+
 
 class ProblemParser(BaseAgent):
     """Classifies aging problems into categories based on hallmarks of aging."""
     
     def __init__(self, config_path=None):
         super().__init__(config_path)
-        self.llm = LLMHelper(config_path)
+        self.llm = get_llm_helper(config_path)
         # Keywords mapping for each category
         self.category_keywords = {
             ProblemCategory.GENOMIC_INSTABILITY: [
@@ -50,6 +59,23 @@ class ProblemParser(BaseAgent):
                 "cell-cell communication", "signaling"
             ],
         }
+        self._category_keywords_lower = {
+            category: [keyword.lower() for keyword in keywords]
+            for category, keywords in self.category_keywords.items()
+        }
+        self._keyword_automaton = self._build_keyword_automaton()
+    
+    def _build_keyword_automaton(self):
+        """Build an Aho-Corasick automaton over all category keywords, if available."""
+        if ahocorasick is None:
+            return None
+        
+        automaton = ahocorasick.Automaton()
+        for category, keywords in self._category_keywords_lower.items():
+            for keyword in keywords:
+                automaton.add_word(keyword, (category, keyword))
+        automaton.make_automaton()
+        return automaton
     
     def process(self, text: str, source: Optional[str] = None, source_id: Optional[str] = None) -> Problem:
         """
@@ -65,23 +91,35 @@ class ProblemParser(BaseAgent):
         """
         # Try LLM extraction first if enabled
         if self.llm.enabled:
-            llm_result = self.llm.extract_problem_info(text)
-            if llm_result and llm_result.get("title"):
-                try:
-                    category = ProblemCategory(llm_result.get("category", "other"))
-                except ValueError:
-                    category = ProblemCategory.OTHER
-                
-                problem = Problem(
-                    title=llm_result.get("title", text[:200]),
-                    description=llm_result.get("description", text),
-                    category=category,
-                    source=source,
-                    source_id=source_id
-                )
+            problem = self._problem_from_llm(self.llm.extract_problem_info(text), text, source, source_id)
+            if problem is not None:
                 return problem
         
         # Fallback to rule-based extraction
+        return self._rule_based_problem(text, source, source_id)
+    
+    def _problem_from_llm(self, llm_result: Dict[str, Any], text: str, source: Optional[str],
+                          source_id: Optional[str]) -> Optional[Problem]:
+        """Build a Problem from an LLM extraction result, or None if it is unusable."""
+        if not llm_result or not llm_result.get("title"):
+            return None
+        
+        try:
+            category = ProblemCategory(llm_result.get("category", "other"))
+        except ValueError:
+            category = ProblemCategory.OTHER
+        
+        problem = Problem(
+            title=llm_result.get("title", text[:200]),
+            description=llm_result.get("description", text),
+            category=category,
+            source=source,
+            source_id=source_id
+        )
+        return problem
+    
+    def _rule_based_problem(self, text: str, source: Optional[str], source_id: Optional[str]) -> Problem:
+        """Build a Problem with heuristic title extraction and keyword classification."""
         title, description = self._extract_title_description(text)
         category = self._classify_category(text)
         
@@ -104,7 +142,7 @@ class ProblemParser(BaseAgent):
             description = '\n'.join(lines[1:]).strip()
         else:
             # Try to split by sentence
-            sentences = re.split(r'[.!?]\s+', text)
+            sentences = _SENTENCE_SPLIT_RE.split(text)
             if len(sentences) > 1:
                 title = sentences[0]
                 description = '. '.join(sentences[1:])
@@ -128,10 +166,23 @@ class ProblemParser(BaseAgent):
         text_lower = text.lower()
         category_scores = {}
         
-        for category, keywords in self.category_keywords.items():
-            score = sum(1 for keyword in keywords if keyword.lower() in text_lower)
-            if score > 0:
-                category_scores[category] = score
+        if self._keyword_automaton is not None:
+            # Score each category by the number of distinct keywords present
+            matched = {match for _, match in self._keyword_automaton.iter(text_lower)}
+            matched_counts = {}
+            for category, _ in matched:
+                matched_counts[category] = matched_counts.get(category, 0) + 1
+            # Keep category order so ties resolve as in the per-keyword scan
+            category_scores = {
+                category: matched_counts[category]
+                for category in self.category_keywords
+                if category in matched_counts
+            }
+        else:
+            for category, keywords in self._category_keywords_lower.items():
+                score = sum(1 for keyword in keywords if keyword in text_lower)
+                if score > 0:
+                    category_scores[category] = score
         
         if category_scores:
             # Return category with highest score
@@ -147,6 +198,19 @@ class ProblemParser(BaseAgent):
         if source_ids is None:
             source_ids = [None] * len(texts)
         
-        return [self.process(text, source, source_id) 
-                for text, source, source_id in zip(texts, sources, source_ids)]
+        if not self.llm.enabled:
+            return [self._rule_based_problem(text, source, source_id)
+                    for text, source, source_id in zip(texts, sources, source_ids)]
+        
+        # Extract all texts with batched LLM requests instead of one request per text
+        llm_results = self.llm.extract_problems_batch(texts)
+        
+        problems = []
+        for text, source, source_id, llm_result in zip(texts, sources, source_ids, llm_results):
+            problem = self._problem_from_llm(llm_result, text, source, source_id)
+            if problem is None:
+                problem = self._rule_based_problem(text, source, source_id)
+            problems.append(problem)
+        
+        return problems
 
@@ -1,11 +1,19 @@
 """Resource Mapper agent that finds existing tools and resources."""
 
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Mapping
+from functools import lru_cache
+from types import MappingProxyType
+from pathlib import Path
+import threading
 from longevity_map.models.resource import Resource, ResourceType
-from longevity_map.models.capability import Capability
+from longevity_map.models.capability import Capability, CapabilityType
 from longevity_map.agents.base_agent import BaseAgent
 from longevity_map.database.session import SessionLocal
+from longevity_map.utils.embedding_cache import (
+    EmbeddingCache, content_hash, default_store_path, load_embedding_store, save_embedding_store
+)
 from sqlalchemy.orm import Session
+from sqlalchemy import select
 # Lazy import to avoid loading heavy model in serverless
 try:
     from sentence_transformers import SentenceTransformer
@@ -20,24 +28,113 @@ try:
 except ImportError:
     NUMPY_AVAILABLE = False
     np = None
+# faiss is optional - approximate neighbor search for large resource sets
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
+# Rows of the similarity matrix computed at a time, bounding memory to
+# _SIMILARITY_BLOCK_ROWS x N instead of N x N
+_SIMILARITY_BLOCK_ROWS = 1024
+
+
+# Resource types that can fill each capability type
+_COMPATIBLE_RESOURCE_TYPES: Mapping[CapabilityType, Tuple[ResourceType, ...]] = MappingProxyType({
+    CapabilityType.MEASUREMENT_TOOL: (ResourceType.CORE_FACILITY, ResourceType.HARDWARE, ResourceType.SOFTWARE),
+    CapabilityType.MODEL_SYSTEM: (ResourceType.MOUSE_MODEL, ResourceType.CELL_LINE),
+    CapabilityType.DATASET: (ResourceType.DATASET, ResourceType.DATABASE),
+    CapabilityType.COMPUTATIONAL_METHOD: (ResourceType.SOFTWARE,),
+    CapabilityType.SOFTWARE: (ResourceType.SOFTWARE,),
+    CapabilityType.HARDWARE: (ResourceType.HARDWARE, ResourceType.CORE_FACILITY),
+    CapabilityType.PROTOCOL: (ResourceType.PROTOCOL,),
+    CapabilityType.INFRASTRUCTURE: (ResourceType.CORE_FACILITY, ResourceType.INFRASTRUCTURE, ResourceType.HARDWARE),
+})
+_ALL_RESOURCE_TYPES: Tuple[ResourceType, ...] = tuple(ResourceType)
+
+
+@lru_cache(maxsize=4096)
+def _word_set(text: str) -> frozenset:
+    """Lowercased word set of a text, cached since resources are re-scored per capability."""
+    return frozenset(text.lower().split())
 
 
 class ResourceMapper(BaseAgent):
     """Maps capabilities to existing resources using semantic similarity."""
     
+    MODEL_NAME = 'all-MiniLM-L6-v2'
+    
     def __init__(self, config_path=None):
         super().__init__(config_path)
         self.similarity_threshold = self.agent_config.get("similarity_threshold", 0.7)
+        # Duplicate detection switches to an HNSW index above this many resources
+        self.ann_min_resources = self.agent_config.get("ann_min_resources", 5000)
+        self.ann_neighbors = self.agent_config.get("ann_neighbors", 16)
+        # Packed (rows, D) float32 matrix of L2-normalized resource embeddings, with
+        # each resource's row and the content hash its embedding was computed from
+        self._embedding_matrix = None
+        self._embedding_rows: Dict[int, int] = {}
+        self._embedding_hashes: Dict[int, bytes] = {}
+        self._embedding_lock = threading.RLock()
+        self.embedding_store_path = Path(self.agent_config.get("embedding_store_path") or default_store_path())
+        # threshold -> (resource_id -> content_hash, resource_id -> similar resource ids)
+        self._similarity_graphs: Dict[float, Tuple[Dict[int, bytes], Dict[int, set]]] = {}
+        self._similarity_graphs_lock = threading.Lock()
+        self.embedding_cache = None
         # Initialize sentence transformer for semantic similarity (lazy load)
         self.model = None
+        self.embedding_model_id = self.MODEL_NAME
         if SENTENCE_TRANSFORMERS_AVAILABLE:
-            try:
-                self.model = SentenceTransformer('all-MiniLM-L6-v2')
-            except Exception as e:
-                self.log(f"Could not load sentence transformer: {e}. Using simple matching.", "WARNING")
-                self.model = None
+            self.model = self._load_model()
         else:
             self.log("Sentence transformers not available. Using simple matching.", "INFO")
+        
+        if self.model is not None:
+            # Persist resource embeddings so each resource is encoded once per content change
+            try:
+                self.embedding_cache = EmbeddingCache(
+                    self.agent_config.get("embedding_cache_path"),
+                    model_name=self.embedding_model_id
+                )
+            except Exception as e:
+                self.log(f"Could not open embedding cache: {e}. Embeddings will not be persisted.", "WARNING")
+            
+            if NUMPY_AVAILABLE:
+                store = load_embedding_store(self.embedding_store_path)
+                if store is not None:
+                    self._set_embedding_store(*store)
+        
+        # Capability texts repeat across calls (e.g. when re-analyzing), so memoize them
+        self._encode_capability = lru_cache(maxsize=1024)(self._encode_text)
+    
+    def _load_model(self):
+        """
+        Load the sentence transformer, preferring the int8-quantized ONNX export.
+        
+        The ONNX backend needs sentence-transformers >= 3.2 with onnxruntime
+        installed; otherwise the regular PyTorch model is loaded.
+        """
+        backend = self.agent_config.get("embedding_backend", "onnx")
+        if backend == "onnx":
+            onnx_file = self.agent_config.get("onnx_model_file", "onnx/model_qint8_avx512_vnni.onnx")
+            try:
+                model = SentenceTransformer(
+                    self.MODEL_NAME,
+                    backend="onnx",
+                    model_kwargs={"file_name": onnx_file}
+                )
+                # Quantized embeddings differ slightly, so cache them separately
+                self.embedding_model_id = f"{self.MODEL_NAME}/{onnx_file}"
+                return model
+            except Exception as e:
+                self.log(f"Could not load ONNX sentence transformer: {e}. Using PyTorch model.", "INFO")
+        
+        try:
+            return SentenceTransformer(self.MODEL_NAME)
+        except Exception as e:
+            self.log(f"Could not load sentence transformer: {e}. Using simple matching.", "WARNING")
+            return None
     
     def process(self, capability: Capability, db: Session) -> List[Tuple[Resource, float]]:
         """
@@ -50,44 +147,82 @@ class ResourceMapper(BaseAgent):
         Returns:
             List of (Resource, match_score) tuples
         """
-        # Get all active resources of compatible types
-        compatible_types = self._get_compatible_resource_types(capability.type)
+        return self.process_batch([capability], db)[0]
+    
+    def process_batch(self, capabilities: List[Capability], db: Session) -> List[List[Tuple[Resource, float]]]:
+        """
+        Find matching resources for several capabilities with one resource query.
+        
+        Args:
+            capabilities: Capabilities to find resources for
+            db: Database session
+            
+        Returns:
+            List aligned with capabilities of (Resource, match_score) lists,
+            best match first
+        """
+        if not capabilities:
+            return []
+        
+        # Get all active resources of any type compatible with these capabilities
+        compatible_types = {
+            cap_type: self._get_compatible_resource_types(cap_type)
+            for cap_type in {capability.type for capability in capabilities}
+        }
         resources = db.query(Resource).filter(
-            Resource.type.in_(compatible_types),
+            Resource.type.in_({t for types in compatible_types.values() for t in types}),
             Resource.is_active == True
         ).all()
         
         if not resources:
-            return []
+            return [[] for _ in capabilities]
         
-        # Calculate similarity scores
-        matches = []
-        capability_text = f"{capability.name} {capability.description}"
+        # Positions of each capability type's compatible resources
+        candidates_by_type = {
+            cap_type: [i for i, resource in enumerate(resources) if resource.type in types]
+            for cap_type, types in compatible_types.items()
+        }
+        capability_texts = [f"{capability.name} {capability.description}" for capability in capabilities]
         
-        for resource in resources:
-            score = self._calculate_similarity(capability_text, resource)
-            if score >= self.similarity_threshold:
-                matches.append((resource, score))
+        if self.model is not None and NUMPY_AVAILABLE:
+            try:
+                # One encode batch for the capabilities, one for the resources and a
+                # single matrix product instead of a model call per pair
+                if len(capability_texts) == 1:
+                    capability_embeddings = self._encode_capability(capability_texts[0])[None, :]
+                else:
+                    capability_embeddings = self._encode_texts(capability_texts)
+                all_scores = capability_embeddings @ self._get_resource_embeddings(resources).T
+                
+                results = []
+                for capability, scores in zip(capabilities, all_scores):
+                    positions = np.asarray(candidates_by_type[capability.type], dtype=np.intp)
+                    scores = scores[positions]
+                    candidates = np.flatnonzero(scores >= self.similarity_threshold)
+                    order = candidates[np.argsort(-scores[candidates], kind="stable")]
+                    results.append([(resources[positions[i]], float(scores[i])) for i in order])
+                return results
+            except Exception as e:
+                self.log(f"Error calculating similarity: {e}", "WARNING")
         
-        # Sort by score descending
-        matches.sort(key=lambda x: x[1], reverse=True)
+        # Fallback to simple keyword matching
+        results = []
+        for capability, capability_text in zip(capabilities, capability_texts):
+            matches = []
+            for i in candidates_by_type[capability.type]:
+                score = self._calculate_similarity(capability_text, resources[i])
+                if score >= self.similarity_threshold:
+                    matches.append((resources[i], score))
+            
+            # Sort by score descending
+            matches.sort(key=lambda x: x[1], reverse=True)
+            results.append(matches)
         
-        return matches
+        return results
     
-    def _get_compatible_resource_types(self, capability_type) -> List[ResourceType]:
+    def _get_compatible_resource_types(self, capability_type) -> Tuple[ResourceType, ...]:
         """Get compatible resource types for a capability type."""
-        mapping = {
-            "measurement_tool": [ResourceType.CORE_FACILITY, ResourceType.HARDWARE, ResourceType.SOFTWARE],
-            "model_system": [ResourceType.MOUSE_MODEL, ResourceType.CELL_LINE],
-            "dataset": [ResourceType.DATASET, ResourceType.DATABASE],
-            "computational_method": [ResourceType.SOFTWARE],
-            "software": [ResourceType.SOFTWARE],
-            "hardware": [ResourceType.HARDWARE, ResourceType.CORE_FACILITY],
-            "protocol": [ResourceType.PROTOCOL],
-            "infrastructure": [ResourceType.CORE_FACILITY, ResourceType.INFRASTRUCTURE, ResourceType.HARDWARE],
-        }
-        
-        return mapping.get(capability_type.value, list(ResourceType))
+        return _COMPATIBLE_RESOURCE_TYPES.get(capability_type, _ALL_RESOURCE_TYPES)
     
     def _calculate_similarity(self, capability_text: str, resource: Resource) -> float:
         """Calculate similarity score between capability and resource."""
@@ -96,36 +231,148 @@ class ResourceMapper(BaseAgent):
             return self._simple_similarity(capability_text, resource)
         
         try:
-            resource_text = f"{resource.name} {resource.description}"
-            embeddings = self.model.encode([capability_text, resource_text])
-            # Use numpy if available, otherwise calculate manually
-            if NUMPY_AVAILABLE and np is not None:
-                similarity = np.dot(embeddings[0], embeddings[1]) / (
-                    np.linalg.norm(embeddings[0]) * np.linalg.norm(embeddings[1])
-                )
-            else:
-                # Manual cosine similarity calculation without numpy
-                dot_product = sum(a * b for a, b in zip(embeddings[0], embeddings[1]))
-                norm_a = sum(a * a for a in embeddings[0]) ** 0.5
-                norm_b = sum(b * b for b in embeddings[1]) ** 0.5
-                similarity = dot_product / (norm_a * norm_b) if (norm_a * norm_b) > 0 else 0.0
-            return float(similarity)
+            capability_embedding = self._encode_capability(capability_text)
+            resource_embedding = self._get_resource_embeddings([resource])[0]
+            # Embeddings are L2-normalized, so the dot product is the cosine similarity
+            return float(np.dot(capability_embedding, resource_embedding))
         except Exception as e:
             self.log(f"Error calculating similarity: {e}", "WARNING")
             return self._simple_similarity(capability_text, resource)
     
     def _simple_similarity(self, capability_text: str, resource: Resource) -> float:
         """Simple keyword-based similarity as fallback."""
-        capability_words = set(capability_text.lower().split())
-        resource_words = set(f"{resource.name} {resource.description}".lower().split())
+        capability_words = _word_set(capability_text)
+        resource_words = _word_set(f"{resource.name} {resource.description}")
         
         if not capability_words or not resource_words:
             return 0.0
         
-        intersection = capability_words & resource_words
-        union = capability_words | resource_words
+        # Jaccard index; |A | B| = |A| + |B| - |A & B| avoids building the union
+        overlap = len(capability_words & resource_words)
+        return overlap / (len(capability_words) + len(resource_words) - overlap)
+    
+    def _encode_texts(self, texts: List[str]):
+        """Encode texts in batches into an (N, D) matrix of L2-normalized embeddings."""
+        return self.model.encode(
+            texts,
+            batch_size=64,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        )
+    
+    def _encode_text(self, text: str):
+        """Encode a single text into an L2-normalized embedding."""
+        return self._encode_texts([text])[0]
+    
+    def _get_resource_embeddings(self, resources: List[Resource]):
+        """
+        Get an (N, D) matrix of embeddings for resources.
+        
+        Embeddings are looked up in the packed in-memory matrix, then in the on-disk
+        cache, and only resources missing from both (or whose text changed) are
+        encoded, in one batch.
+        """
+        texts = [f"{r.name} {r.description}" for r in resources]
+        hashes = [content_hash(text, self.embedding_model_id) for text in texts]
+        
+        with self._embedding_lock:
+            missing = [i for i, (resource, text_hash) in enumerate(zip(resources, hashes))
+                       if self._embedding_hashes.get(resource.id) != text_hash]
         
-        return len(intersection) / len(union) if union else 0.0
+        if missing and self.embedding_cache is not None:
+            stored = self.embedding_cache.get_many(
+                (resources[i].id, hashes[i]) for i in missing
+            )
+            found = [i for i in missing if resources[i].id in stored]
+            self._store_embeddings(
+                [resources[i].id for i in found],
+                [hashes[i] for i in found],
+                [stored[resources[i].id] for i in found]
+            )
+            missing = [i for i in missing if resources[i].id not in stored]
+        
+        if missing:
+            encoded = self._encode_texts([texts[i] for i in missing])
+            ids = [resources[i].id for i in missing]
+            missing_hashes = [hashes[i] for i in missing]
+            self._store_embeddings(ids, missing_hashes, encoded)
+            if self.embedding_cache is not None:
+                self.embedding_cache.put_many(list(zip(ids, missing_hashes, encoded)))
+        
+        with self._embedding_lock:
+            return self._embedding_matrix[[self._embedding_rows[r.id] for r in resources]]
+    
+    def _store_embeddings(self, ids: List[int], hashes: List[bytes], embeddings) -> None:
+        """Write embeddings into the packed matrix, reusing a resource's row when it has one."""
+        if not ids:
+            return
+        
+        with self._embedding_lock:
+            if self._embedding_matrix is not None and self._embedding_matrix.shape[1] != len(embeddings[0]):
+                # Stored rows came from a model with a different dimension
+                self._set_embedding_store([], [], np.zeros((0, len(embeddings[0])), dtype=np.float32))
+            
+            new_ids = [resource_id for resource_id in ids if resource_id not in self._embedding_rows]
+            used = len(self._embedding_rows)
+            if self._embedding_matrix is None or used + len(new_ids) > len(self._embedding_matrix):
+                # Grow geometrically so appends stay amortized O(1) per row
+                capacity = max(2 * (used + len(new_ids)), 256)
+                matrix = np.zeros((capacity, len(embeddings[0])), dtype=np.float32)
+                if self._embedding_matrix is not None:
+                    matrix[:used] = self._embedding_matrix[:used]
+                self._embedding_matrix = matrix
+            
+            for resource_id in new_ids:
+                self._embedding_rows[resource_id] = len(self._embedding_rows)
+            rows = [self._embedding_rows[resource_id] for resource_id in ids]
+            self._embedding_matrix[rows] = np.asarray(embeddings, dtype=np.float32)
+            self._embedding_hashes.update(zip(ids, hashes))
+    
+    def _set_embedding_store(self, ids: List[int], hashes: List[bytes], embeddings) -> None:
+        """Replace the packed matrix with embeddings for exactly these resources."""
+        with self._embedding_lock:
+            self._embedding_matrix = np.ascontiguousarray(embeddings, dtype=np.float32)
+            self._embedding_rows = {resource_id: row for row, resource_id in enumerate(ids)}
+            self._embedding_hashes = dict(zip(ids, hashes))
+    
+    def rebuild_embedding_store(self, db: Session) -> int:
+        """
+        Re-pack embeddings of all active resources in id order and save them to disk.
+        
+        Drops rows of removed or deactivated resources and lets later processes
+        start from a warm matrix instead of reading the cache row by row.
+        
+        Args:
+            db: Database session
+            
+        Returns:
+            Number of resources in the store
+        """
+        if self.model is None or not NUMPY_AVAILABLE:
+            return 0
+        
+        resources = db.execute(
+            select(Resource.id, Resource.name, Resource.description)
+            .filter_by(is_active=True)
+            .order_by(Resource.id)
+            .execution_options(yield_per=1000)
+        ).all()
+        if not resources:
+            return 0
+        
+        embeddings = self._get_resource_embeddings(resources)
+        ids = [resource.id for resource in resources]
+        with self._embedding_lock:
+            hashes = [self._embedding_hashes[resource_id] for resource_id in ids]
+        self._set_embedding_store(ids, hashes, embeddings)
+        
+        try:
+            save_embedding_store(self.embedding_store_path, ids, hashes, embeddings)
+        except OSError as e:
+            self.log(f"Could not write embedding store: {e}", "WARNING")
+        
+        return len(ids)
     
     def find_duplicates(self, db: Session, threshold: float = 0.9) -> List[List[Resource]]:
         """
@@ -138,36 +385,119 @@ class ResourceMapper(BaseAgent):
         Returns:
             List of lists of duplicate resources
         """
-        resources = db.query(Resource).filter(Resource.is_active == True).all()
+        if self.model is None or not NUMPY_AVAILABLE:
+            return []
+        
+        # Only the columns needed for embedding are loaded for the similarity pass;
+        # full Resource objects are fetched afterwards for clustered rows only
+        resources = db.execute(
+            select(Resource.id, Resource.name, Resource.description)
+            .filter_by(is_active=True)
+            .execution_options(yield_per=1000)
+        ).all()
         
-        if not resources or self.model is None:
+        if not resources:
             return []
         
-        duplicates = []
-        processed = set()
+        # Encode every resource once, then find each resource's later, similar resources
+        embeddings = self._get_resource_embeddings(resources)
+        neighbors = self._similar_neighbors(resources, embeddings, threshold)
+        
+        groups = []
+        processed = np.zeros(len(resources), dtype=bool)
         
-        for i, resource1 in enumerate(resources):
-            if resource1.id in processed:
+        # Group each resource with the later, not yet grouped resources similar to it
+        for i, candidates in enumerate(neighbors):
+            if processed[i] or len(candidates) == 0:
                 continue
             
-            duplicate_group = [resource1]
+            matches = candidates[~processed[candidates]]
+            if len(matches) == 0:
+                continue
             
-            for resource2 in resources[i+1:]:
-                if resource2.id in processed:
-                    continue
-                
-                similarity = self._calculate_similarity(
-                    f"{resource1.name} {resource1.description}",
-                    resource2
-                )
-                
-                if similarity >= threshold:
-                    duplicate_group.append(resource2)
-                    processed.add(resource2.id)
+            processed[matches] = True
+            processed[i] = True
+            groups.append([resources[i].id] + [resources[j].id for j in matches])
+        
+        if not groups:
+            return []
+        
+        grouped_ids = [resource_id for group in groups for resource_id in group]
+        by_id = {
+            resource.id: resource
+            for resource in db.query(Resource).filter(Resource.id.in_(grouped_ids))
+        }
+        
+        return [[by_id[resource_id] for resource_id in group] for group in groups]
+    
+    def _similar_neighbors(self, resources, embeddings, threshold: float) -> List[Any]:
+        """
+        For each row i, find the rows j > i whose embedding similarity is >= threshold.
+        
+        The exact search keeps a similarity graph per threshold between calls, so
+        only resources that are new or whose text changed are compared against
+        the rest, instead of recomputing all N x N pairs.
+        
+        Args:
+            resources: Resource rows (with id) in the same order as embeddings
+            embeddings: (N, D) matrix of L2-normalized embeddings
+            threshold: Minimum cosine similarity
             
-            if len(duplicate_group) > 1:
-                duplicates.append(duplicate_group)
-                processed.add(resource1.id)
+        Returns:
+            List of N sorted index arrays
+        """
+        if FAISS_AVAILABLE and len(embeddings) >= self.ann_min_resources:
+            return self._ann_neighbors(embeddings, threshold)
         
-        return duplicates
-
+        ids = [resource.id for resource in resources]
+        position = {resource_id: i for i, resource_id in enumerate(ids)}
+        # _get_resource_embeddings has recorded the current content hash of every resource
+        with self._embedding_lock:
+            hashes = {resource_id: self._embedding_hashes[resource_id] for resource_id in ids}
+        
+        with self._similarity_graphs_lock:
+            graph_hashes, adjacency = self._similarity_graphs.setdefault(threshold, ({}, {}))
+            
+            # Forget resources that were removed, deactivated or edited since the last call
+            stale = [resource_id for resource_id, text_hash in graph_hashes.items()
+                     if hashes.get(resource_id) != text_hash]
+            for resource_id in stale:
+                del graph_hashes[resource_id]
+                for other_id in adjacency.pop(resource_id, ()):
+                    if other_id in adjacency:
+                        adjacency[other_id].discard(resource_id)
+            
+            # Compare new or changed resources against all resources, a block at a time
+            changed = [i for i, resource_id in enumerate(ids) if resource_id not in graph_hashes]
+            for start in range(0, len(changed), _SIMILARITY_BLOCK_ROWS):
+                rows = changed[start:start + _SIMILARITY_BLOCK_ROWS]
+                block = embeddings[rows] @ embeddings.T
+                for i, row in zip(rows, block):
+                    resource_id = ids[i]
+                    similar = {ids[j] for j in np.flatnonzero(row >= threshold) if j != i}
+                    adjacency.setdefault(resource_id, set()).update(similar)
+                    for other_id in similar:
+                        adjacency.setdefault(other_id, set()).add(resource_id)
+                    graph_hashes[resource_id] = hashes[resource_id]
+            
+            return [
+                np.array(sorted(j for j in (position[other_id] for other_id in adjacency.get(resource_id, ()))
+                                if j > i), dtype=np.intp)
+                for i, resource_id in enumerate(ids)
+            ]
+    
+    def _ann_neighbors(self, embeddings, threshold: float) -> List[Any]:
+        """Approximate the exact neighbor search using the top ann_neighbors hits from an HNSW index."""
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        k = min(self.ann_neighbors + 1, len(embeddings))  # +1: each row finds itself
+        
+        index = faiss.IndexHNSWFlat(embeddings.shape[1], 32, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = 100
+        index.hnsw.efSearch = max(64, k)
+        index.add(embeddings)
+        scores, ids = index.search(embeddings, k)
+        
+        neighbors = []
+        for i, (row_scores, row_ids) in enumerate(zip(scores, ids)):
+            neighbors.append(np.sort(row_ids[(row_ids > i) & (row_scores >= threshold)]))
+        return neighbors
@@ -1,29 +1,48 @@
 """Updater agent that continuously ingests new papers, grants, and announcements."""
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
 from longevity_map.agents.base_agent import BaseAgent
 from longevity_map.agents.problem_parser import ProblemParser
 from longevity_map.agents.capability_extractor import CapabilityExtractor
 from longevity_map.agents.resource_mapper import ResourceMapper
 from longevity_map.database.session import SessionLocal, init_db
+from longevity_map.utils.response_cache import bump_data_version
 from longevity_map.models.problem import Problem
 from longevity_map.models.capability import Capability
 from longevity_map.models.mapping import ProblemCapabilityMapping, CapabilityResourceMapping
 from sqlalchemy.orm import Session
+from sqlalchemy import insert, inspect, tuple_
 import logging
+import queue
+import threading
 
 logger = logging.getLogger(__name__)
 
+# Chunks a source may fetch ahead of the one being written
+_PREFETCH_CHUNKS = 2
+
+
+def _put_unless_stopped(chunks: queue.Queue, chunk: Optional[List[Dict[str, Any]]], stop: threading.Event):
+    """Put a chunk on the queue, giving up if the consumer has stopped reading."""
+    while not stop.is_set():
+        try:
+            chunks.put(chunk, timeout=0.5)
+            return
+        except queue.Full:
+            continue
+
 
 class Updater(BaseAgent):
     """Continuously updates the database with new information."""
     
     def __init__(self, config_path=None):
         super().__init__(config_path)
-        self.problem_parser = ProblemParser(config_path)
-        self.capability_extractor = CapabilityExtractor(config_path)
-        self.resource_mapper = ResourceMapper(config_path)
+        # Sub-agents are built on first use (see the properties below)
+        self._config_path = config_path
         
         # Initialize data source modules
         try:
@@ -37,21 +56,33 @@ class Updater(BaseAgent):
         except ImportError:
             self.data_sources = {}
     
+    @cached_property
+    def problem_parser(self) -> ProblemParser:
+        """Problem parser, constructed on first access."""
+        return ProblemParser(self._config_path)
+    
+    @cached_property
+    def capability_extractor(self) -> CapabilityExtractor:
+        """Capability extractor, constructed on first access."""
+        return CapabilityExtractor(self._config_path)
+    
+    @cached_property
+    def resource_mapper(self) -> ResourceMapper:
+        """Resource mapper (and its embedding model), constructed on first access."""
+        return ResourceMapper(self._config_path)
+    
     def process(self, days_back: int = 30) -> Dict[str, int]:
         """
         Process and update all data sources (required by BaseAgent).
         
         Args:
             days_back: Number of days to look back for updates
-            
+        
         Returns:
             Dict with counts of items added from each source
         """
-        db = SessionLocal()
-        try:
+        with SessionLocal() as db:
             return self.update_all(db, days_back)
-        finally:
-            db.close()
     
     def update_all(self, db: Session, days_back: int = 30) -> Dict[str, int]:
         """
@@ -60,55 +91,159 @@ class Updater(BaseAgent):
         Args:
             db: Database session
             days_back: Number of days to look back for updates
-            
+        
         Returns:
             Dict with counts of items added from each source
         """
         results = {}
         cutoff_date = datetime.now() - timedelta(days=days_back)
+        sources = [(name, module) for name, module in self.data_sources.items() if module is not None]
         
-        # Update from each enabled source
-        for source_name, source_module in self.data_sources.items():
-            if source_module is None:
-                continue
-            
-            try:
-                count = self._update_source(db, source_name, source_module, cutoff_date)
-                results[source_name] = count
-                self.log(f"Updated {count} items from {source_name}", "INFO")
-            except Exception as e:
-                self.log(f"Error updating {source_name}: {e}", "ERROR")
-                results[source_name] = 0
+        if sources:
+            # Sources are fetched concurrently, one worker thread each (so every
+            # source keeps its own rate limiting), while their chunks are written
+            # sequentially through the single session on this thread
+            with ThreadPoolExecutor(max_workers=len(sources), thread_name_prefix="updater-fetch") as executor:
+                streams = {}
+                for source_name, source_module in sources:
+                    chunks = queue.Queue(maxsize=_PREFETCH_CHUNKS)
+                    stop = threading.Event()
+                    executor.submit(self._fetch_chunks, source_name, source_module, cutoff_date, chunks, stop)
+                    streams[source_name] = (chunks, stop)
+                
+                # Update from each enabled source
+                for source_name, _ in sources:
+                    chunks, stop = streams[source_name]
+                    try:
+                        count = self._update_source(db, source_name, chunks, stop)
+                        results[source_name] = count
+                        self.log(f"Updated {count} items from {source_name}", "INFO")
+                    except Exception as e:
+                        self.log(f"Error updating {source_name}: {e}", "ERROR")
+                        results[source_name] = 0
+        
+        # Cached analysis results may be stale now
+        bump_data_version()
+        
+        # Re-pack resource embeddings so later matching starts from a warm matrix
+        try:
+            self.resource_mapper.rebuild_embedding_store(db)
+        except Exception as e:
+            self.log(f"Error rebuilding embedding store: {e}", "ERROR")
         
         return results
     
-    def _update_source(self, db: Session, source_name: str, source_module: Any, 
-                      cutoff_date: datetime) -> int:
-        """Update from a specific data source."""
-        count = 0
+    def _fetch_chunks(self, source_name: str, source_module: Any, cutoff_date: datetime,
+                      chunks: queue.Queue, stop: threading.Event):
+        """
+        Fetch a source's items into a queue of chunks (runs on a worker thread).
         
-        # Fetch new items
+        Args:
+            source_name: Data source name
+            source_module: Data source module
+            cutoff_date: Only fetch items after this date
+            chunks: Queue receiving item lists, then None once the source is exhausted
+            stop: Set by the consumer to abandon the fetch
+        """
         try:
-            # Try fetch_recent first, with max_results limit
+            # Try fetch_recent first, with max_results limit, streamed page by
+            # page when the source supports it
             max_results = self.config.get("data_sources", {}).get(source_name, {}).get("max_results", 100)
-            if hasattr(source_module, 'fetch_recent'):
+            if hasattr(source_module, 'fetch_recent_iter'):
+                items = source_module.fetch_recent_iter(cutoff_date, max_results=max_results)
+            elif hasattr(source_module, 'fetch_recent'):
                 items = source_module.fetch_recent(cutoff_date, max_results=max_results)
             else:
                 items = source_module.fetch_all(max_results=max_results)
+            items = iter(items)
             
-            logger.info(f"Fetched {len(items)} items from {source_name}")
-            
+            # Fixed-size chunks so memory stays bounded however many items the
+            # source returns
+            chunk_size = self.config.get("updater", {}).get("chunk_size", 500)
+            while not stop.is_set():
+                chunk = list(islice(items, chunk_size))
+                if not chunk:
+                    break
+                _put_unless_stopped(chunks, chunk, stop)
+        
         except Exception as e:
             logger.error(f"Error fetching from {source_name}: {e}")
-            return 0
+        finally:
+            _put_unless_stopped(chunks, None, stop)
+    
+    def _update_source(self, db: Session, source_name: str, chunks: queue.Queue,
+                      stop: threading.Event) -> int:
+        """Update from a specific data source, committing one chunk at a time."""
+        count = 0
+        fetched = 0
+        known_source_ids = set()
+        
+        try:
+            while True:
+                chunk = chunks.get()
+                if chunk is None:
+                    break
+                
+                fetched += len(chunk)
+                # Each chunk is one transaction: a failed chunk is rolled back on
+                # its own, keeping earlier chunks and moving on to the next
+                chunk_source_ids = set()
+                try:
+                    count += self._update_items(db, source_name, chunk, known_source_ids, chunk_source_ids)
+                except Exception as e:
+                    # The chunk's ids are dropped with it
+                    db.rollback()
+                    self.log(f"Error storing {len(chunk)} items from {source_name}: {e}", "ERROR")
+                    continue
+                known_source_ids |= chunk_source_ids
+        finally:
+            # Release the fetch thread if we stop early
+            stop.set()
         
-        if not items:
+        if not fetched:
             logger.warning(f"No items fetched from {source_name}")
             return 0
         
-        # Process each item
+        logger.info(f"Fetched {fetched} items from {source_name}")
+        return count
+    
+    def _update_items(self, db: Session, source_name: str, items: List[Dict[str, Any]],
+                      known_source_ids: set, chunk_source_ids: set) -> int:
+        """
+        Parse, store and commit one chunk of items from a data source.
+        
+        Args:
+            db: Database session
+            source_name: Data source the items came from
+            items: Item dictionaries from the source
+            known_source_ids: Source ids stored by earlier chunks (not modified)
+            chunk_source_ids: Filled with the source ids this chunk stores or
+                finds already stored
+        
+        Returns:
+            Number of new problems added
+        """
+        count = 0
+        
+        # Skip items already stored with one IN query rather than a lookup per item
+        item_ids = {item.get("id") for item in items if item.get("id") is not None}
+        item_ids -= known_source_ids
+        if item_ids:
+            chunk_source_ids.update(
+                source_id for (source_id,) in db.query(Problem.source_id).filter(
+                    Problem.source == source_name,
+                    Problem.source_id.in_(item_ids)
+                )
+            )
+        
+        # Parse problems and extract their capabilities
+        parsed = []  # (Problem, [Capability])
         for item in items:
             try:
+                item_id = item.get("id")
+                if item_id is not None and (item_id in known_source_ids or item_id in chunk_source_ids):
+                    continue  # Skip duplicates
+                
                 # Parse problem
                 problem = self.problem_parser.process(
                     item.get("text", item.get("abstract", "")),
@@ -122,74 +257,156 @@ class Updater(BaseAgent):
                 elif source_name == "pubmed" and item.get("id"):
                     problem.source_url = f"https://pubmed.ncbi.nlm.nih.gov/{item['id']}"
                 
-                # Check if problem already exists
-                existing = db.query(Problem).filter(
-                    Problem.source == source_name,
-                    Problem.source_id == problem.source_id
-                ).first()
-                
-                if existing:
-                    continue  # Skip duplicates
-                
                 # Extract capabilities
                 capabilities = self.capability_extractor.process(
                     problem.description,
                     problem_id=problem.id
                 )
                 
-                # Save problem
-                db.add(problem)
-                db.flush()  # Get problem.id
+                parsed.append((problem, capabilities))
+                if problem.source_id is not None:
+                    chunk_source_ids.add(problem.source_id)
+            
+            except Exception as e:
+                self.log(f"Error processing item from {source_name}: {e}", "ERROR")
+                continue
+        
+        # Look up every extracted (name, type) in one query; capabilities created
+        # in this batch are added to the same index as they are staged
+        capability_keys = {(cap.name, cap.type) for _, caps in parsed for cap in caps}
+        capabilities_by_key = {}
+        if capability_keys:
+            for cap in db.query(Capability).filter(
+                tuple_(Capability.name, Capability.type).in_(capability_keys)
+            ).order_by(Capability.id):
+                capabilities_by_key.setdefault((cap.name, cap.type), cap)
+        
+        # New rows and mappings are collected rather than added to the session,
+        # so the whole batch goes out as a few multi-row INSERTs at the end
+        new_problems = []
+        new_capabilities = []
+        new_capabilities_set = set()
+        problem_capabilities = []  # (Problem, Capability) pairs
+        
+        for problem, capabilities in parsed:
+            try:
+                # Resolve capabilities against existing and earlier ones
+                item_capabilities = [
+                    capabilities_by_key.setdefault((cap.name, cap.type), cap)
+                    for cap in capabilities
+                ]
                 
-                # Save capabilities and mappings
-                for cap in capabilities:
-                    # Check if capability exists
-                    existing_cap = db.query(Capability).filter(
-                        Capability.name == cap.name,
-                        Capability.type == cap.type
-                    ).first()
-                    
-                    if existing_cap:
-                        cap = existing_cap
-                    else:
-                        db.add(cap)
-                        db.flush()
-                    
-                    # Create mapping
-                    from longevity_map.models.mapping import ProblemCapabilityMapping
-                    mapping = ProblemCapabilityMapping(
-                        problem_id=problem.id,
-                        capability_id=cap.id,
-                        confidence_score=0.8  # Default confidence
-                    )
-                    db.add(mapping)
-                    
-                    # Try to find matching resources
-                    resource_matches = self.resource_mapper.process(cap, db)
-                    for resource, score in resource_matches:
-                        from longevity_map.models.mapping import CapabilityResourceMapping
-                        resource_mapping = CapabilityResourceMapping(
-                            capability_id=cap.id,
-                            resource_id=resource.id,
-                            match_score=score
-                        )
-                        db.add(resource_mapping)
+                # Stage problem, any new capabilities and the mappings
+                new_problems.append(problem)
+                for cap in item_capabilities:
+                    if cap.id is None and cap not in new_capabilities_set:
+                        new_capabilities_set.add(cap)
+                        new_capabilities.append(cap)
+                    problem_capabilities.append((problem, cap))
                 
                 count += 1
-                
+            
             except Exception as e:
                 self.log(f"Error processing item from {source_name}: {e}", "ERROR")
                 continue
         
+        # Match every distinct capability in the chunk against resources in one pass
+        resource_scores = {}  # (Capability, resource_id) -> match score
+        chunk_capabilities = list(dict.fromkeys(cap for _, cap in problem_capabilities))
+        try:
+            all_matches = self.resource_mapper.process_batch(chunk_capabilities, db)
+        except Exception as e:
+            self.log(f"Error matching resources for {source_name}: {e}", "ERROR")
+            all_matches = []
+        for cap, resource_matches in zip(chunk_capabilities, all_matches):
+            for resource, score in resource_matches:
+                resource_scores[(cap, resource.id)] = score
+        
+        # INSERT ... RETURNING assigns ids to every new problem and capability
+        self._insert_returning_ids(db, Problem, new_problems)
+        self._insert_returning_ids(db, Capability, new_capabilities)
+        self._insert_mappings(db, problem_capabilities, resource_scores)
+        
         db.commit()
         return count
     
+    def _insert_returning_ids(self, db: Session, model, objects: List[Any]):
+        """
+        Bulk-insert new model instances and set their ids.
+        
+        The rows go out as batched multi-row INSERT ... RETURNING statements
+        (one round-trip per batch rather than the unit of work's per-object
+        bookkeeping); the returned ids come back in parameter order.
+        
+        Args:
+            db: Database session
+            model: Mapped class of the objects
+            objects: New (transient) instances of model
+        """
+        if not objects:
+            return
+        
+        # Unset columns are left out so their defaults apply
+        keys = [attr.key for attr in inspect(model).column_attrs if attr.key != "id"]
+        rows = [
+            {key: getattr(obj, key) for key in keys if getattr(obj, key) is not None}
+            for obj in objects
+        ]
+        ids = db.scalars(
+            insert(model).returning(model.id, sort_by_parameter_order=True),
+            rows
+        ).all()
+        for obj, id_ in zip(objects, ids):
+            obj.id = id_
+    
+    def _insert_mappings(self, db: Session, problem_capabilities: List[Tuple[Problem, Capability]],
+                         resource_scores: Dict[Tuple[Capability, int], float]):
+        """
+        Bulk-insert the mappings collected for a batch.
+        
+        Args:
+            db: Database session
+            problem_capabilities: (Problem, Capability) pairs, inserted so both have ids
+            resource_scores: (Capability, resource_id) -> match score
+        """
+        # dict.fromkeys drops repeats (a capability extracted twice for one problem)
+        pcm_rows = [
+            {
+                "problem_id": problem.id,
+                "capability_id": cap.id,
+                "confidence_score": 0.8  # Default confidence
+            }
+            for problem, cap in dict.fromkeys(problem_capabilities)
+        ]
+        if pcm_rows:
+            db.execute(insert(ProblemCapabilityMapping), pcm_rows)
+        
+        if not resource_scores:
+            return
+        
+        # Capabilities matched in earlier batches may already have some of these rows
+        capability_ids = {cap.id for cap, _ in resource_scores}
+        existing_pairs = set(
+            db.query(
+                CapabilityResourceMapping.capability_id,
+                CapabilityResourceMapping.resource_id
+            ).filter(CapabilityResourceMapping.capability_id.in_(capability_ids)).all()
+        )
+        crm_rows = [
+            {
+                "capability_id": cap.id,
+                "resource_id": resource_id,
+                "match_score": score
+            }
+            for (cap, resource_id), score in resource_scores.items()
+            if (cap.id, resource_id) not in existing_pairs
+        ]
+        if crm_rows:
+            db.execute(insert(CapabilityResourceMapping), crm_rows)
+    
     def run_scheduled_update(self):
         """Run scheduled update (called by scheduler)."""
-        db = next(SessionLocal())
-        try:
+        with SessionLocal() as db:
             results = self.update_all(db)
             self.log(f"Scheduled update completed: {results}", "INFO")
-        finally:
-            db.close()
 
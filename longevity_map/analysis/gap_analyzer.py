@@ -14,9 +14,7 @@ logger = logging.getLogger(__name__)
 
 def analyze_all_gaps():
     """Analyze all capabilities and identify gaps."""
-    db = next(SessionLocal())
-    
-    try:
+    with SessionLocal() as db:
         gap_analyzer = GapAnalyzer()
         
         # Get all capabilities
@@ -24,19 +22,17 @@ def analyze_all_gaps():
         
         logger.info(f"Analyzing {len(capabilities)} capabilities...")
         
+        # Capabilities that already have a gap, fetched once instead of per capability
+        existing_ids = {capability_id for (capability_id,) in db.query(Gap.capability_id)}
+        pending = [c for c in capabilities if c.id not in existing_ids]
+        
         gaps_created = 0
-        for capability in capabilities:
-            gap = gap_analyzer.process(capability, db)
+        for capability, gap in zip(pending, gap_analyzer.process_batch(pending, db)):
             if gap:
-                # Check if gap already exists
-                existing = db.query(Gap).filter(
-                    Gap.capability_id == capability.id
-                ).first()
-                
-                if not existing:
-                    db.add(gap)
-                    gaps_created += 1
-                    logger.info(f"Created gap for capability: {capability.name}")
+                db.add(gap)
+                existing_ids.add(capability.id)
+                gaps_created += 1
+                logger.info(f"Created gap for capability: {capability.name}")
         
         db.commit()
         logger.info(f"Created {gaps_created} new gaps")
@@ -46,16 +42,11 @@ def analyze_all_gaps():
         logger.info(f"\nTop 10 Keystone Capabilities:")
         for i, keystone in enumerate(keystones, 1):
             logger.info(f"{i}. {keystone['name']} - Unlocks {keystone['num_problems']} problems")
-        
-    finally:
-        db.close()
 
 
 def find_duplication_clusters():
     """Find duplication clusters."""
-    db = next(SessionLocal())
-    
-    try:
+    with SessionLocal() as db:
         coordination_agent = CoordinationAgent()
         clusters = coordination_agent.detect_duplication_clusters(db, min_groups=3)
         
@@ -64,16 +55,11 @@ def find_duplication_clusters():
             logger.info(f"\nCluster {i}: {cluster['num_groups']} groups")
             for resource in cluster['resources']:
                 logger.info(f"  - {resource['name']} ({resource['organization']})")
-    
-    finally:
-        db.close()
 
 
 def analyze_funding_potential():
     """Analyze funding potential of gaps."""
-    db = next(SessionLocal())
-    
-    try:
+    with SessionLocal() as db:
         funding_agent = FundingAgent()
         ranked = funding_agent.rank_gaps_by_funding_potential(db, top_n=20)
         
@@ -86,9 +72,6 @@ def analyze_funding_potential():
                 f"Blocked Value: ${gap['blocked_research_value']/1_000_000:.1f}M, "
                 f"Problems: {gap['num_blocked_problems']}"
             )
-    
-    finally:
-        db.close()
 
 
 if __name__ == "__main__":
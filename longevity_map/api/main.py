@@ -1,15 +1,19 @@
 """FastAPI application for longevity R&D map."""
 
-from fastapi import FastAPI, Depends, HTTPException, Query, BackgroundTasks
+from fastapi import FastAPI, Depends, HTTPException, Query, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from typing import List, Optional
-import yaml
-from pathlib import Path
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import lambda_stmt, select, tuple_
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 import threading
 import logging
+import orjson
 
-from longevity_map.database.session import get_db, init_db
+from longevity_map.api.responses import ORJSONResponse, dumps
+from longevity_map.database.session import get_db, ensure_db, SessionLocal
 from longevity_map.models.problem import Problem, ProblemCategory
 from longevity_map.models.capability import Capability, CapabilityType
 from longevity_map.models.resource import Resource, ResourceType
@@ -18,24 +22,20 @@ from longevity_map.models.mapping import ProblemCapabilityMapping, CapabilityRes
 from longevity_map.agents.gap_analyzer import GapAnalyzer
 from longevity_map.agents.coordination_agent import CoordinationAgent
 from longevity_map.agents.funding_agent import FundingAgent
+from longevity_map.utils.config import default_config_path, load_config
+from longevity_map.utils.response_cache import TTLCache, bump_data_version, data_version
 
-# Initialize database (lazy - will be created on first use if needed)
-# Don't fail if database can't be initialized at import time
-try:
-    init_db()
-except Exception as e:
-    logging.warning(f"Database initialization deferred: {e}")
+# Database tables are created on first use by the get_db dependency
+# (see ensure_db), keeping schema setup off the import path
 
 # Load config - handle missing config.yaml gracefully
-config_path = Path(__file__).parent.parent.parent / "config" / "config.yaml"
-if not config_path.exists():
-    config_path = Path(__file__).parent.parent.parent / "config" / "config.example.yaml"
+config_path = default_config_path()
 
 config = {}
 try:
     if config_path.exists():
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f) or {}
+        # Parsed once per process and shared with the agents
+        config = load_config(config_path)
     else:
         logging.warning("No config file found, using defaults")
 except Exception as e:
@@ -46,14 +46,20 @@ except Exception as e:
 app = FastAPI(
     title="Longevity R&D Map API",
     description="API for mapping open problems in aging sciences to capabilities, resources, and gaps",
-    version="0.1.0"
+    version="0.1.0",
+    # orjson writes response bytes directly, much faster than json.dumps on
+    # the large list payloads
+    default_response_class=ORJSONResponse
 )
 
-# CORS middleware
+# CORS middleware. The frontend never sends credentials, so with the default
+# wildcard the middleware adds a fixed header instead of echoing each
+# request's Origin (browsers reject a wildcard with credentials anyway)
+allowed_origins = list(config.get("api", {}).get("allowed_origins", ["*"]))
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
+    allow_origins=allowed_origins,
+    allow_credentials="*" not in allowed_origins,
     allow_methods=["*"],
     allow_headers=["*"],
 )
@@ -63,9 +69,25 @@ gap_analyzer = GapAnalyzer()
 coordination_agent = CoordinationAgent()
 funding_agent = FundingAgent()
 
-# Global state for fetch status
+# Analysis results only change when new data is written, so repeat calls
+# (e.g. dashboards polling) are served from memory as rendered JSON bodies
+analysis_cache = TTLCache(maxsize=128, ttl=config.get("api", {}).get("cache_ttl", 300))
+# Rendered problem-capability matrix bodies, by (category, ndjson); repeat
+# requests are answered from memory without running the join
+matrix_cache = TTLCache(maxsize=32, ttl=config.get("api", {}).get("cache_ttl", 300))
+
+# Global state for fetch status, only read or written while holding fetch_lock
 fetch_status = {"running": False, "progress": 0, "total": 0, "message": ""}
 fetch_lock = threading.Lock()
+# Incremented when a fetch starts or is cancelled, so a cancelled run can't
+# overwrite the status of (or mark finished) a fetch started after it
+_fetch_generation = 0
+# Papers parsed and extracted concurrently by a background fetch; the work is
+# dominated by waiting on the LLM API
+_EXTRACT_WORKERS = 8
+# Papers a background fetch flushes per savepoint; when a flush fails, only
+# that batch is retried one paper at a time
+_SAVE_BATCH_SIZE = 50
 
 
 @app.get("/")
@@ -78,67 +100,101 @@ def root():
     }
 
 
-@app.get("/problems", response_model=List[dict])
+# List statements are built through lambda_stmt so SQLAlchemy caches them by
+# code location: per request only the bound parameters (filters, offset,
+# limit) change and the compiled SQL is reused
+_PROBLEMS_STMT = lambda_stmt(lambda: select(
+    Problem.id,
+    Problem.title,
+    Problem.description,
+    Problem.category,
+    Problem.source,
+    Problem.source_id,
+    Problem.source_url
+))
+
+_CAPABILITIES_STMT = lambda_stmt(lambda: select(
+    Capability.id,
+    Capability.name,
+    Capability.description,
+    Capability.type,
+    Capability.estimated_cost,
+    Capability.estimated_time,
+    Capability.complexity_score
+))
+
+# Only the returned gap columns, with the capability joined in rather than
+# lazy-loaded per gap
+_GAPS_STMT = lambda_stmt(lambda: select(
+    Gap.id,
+    Gap.capability_id,
+    Capability.name.label("capability_name"),
+    Capability.type.label("capability_type"),
+    Gap.description,
+    Gap.estimated_cost,
+    Gap.estimated_time,
+    Gap.blocked_research_value,
+    Gap.num_blocked_problems,
+    Gap.priority,
+    Gap.impact_score
+).join(Capability, Capability.id == Gap.capability_id))
+
+
+@app.get("/problems")
 def get_problems(
     category: Optional[ProblemCategory] = None,
     limit: int = Query(100, ge=1, le=1000),
-    offset: int = Query(0, ge=0),
-    db: Session = Depends(get_db)
+    offset: int = Query(0, ge=0)
 ):
     """Get problems, optionally filtered by category."""
-    query = db.query(Problem)
-    
+    stmt = _PROBLEMS_STMT
     if category:
-        query = query.filter(Problem.category == category)
-    
-    problems = query.offset(offset).limit(limit).all()
+        stmt += lambda s: s.where(Problem.category == category)
+    stmt += lambda s: s.offset(offset).limit(limit)
     
-    return [
-        {
-            "id": p.id,
-            "title": p.title,
-            "description": p.description,
-            "category": p.category.value,
-            "source": p.source,
-            "source_id": p.source_id,
-            "source_url": p.source_url
-        }
-        for p in problems
-    ]
+    # Pages of up to 1000 problems with full descriptions are encoded as the
+    # rows are fetched rather than built up as one list first
+    ensure_db()
+    db, rows = _start_stream(stmt, yield_per=200)
+    return StreamingResponse(_guarded_stream(_stream_rows(db, rows)), media_type="application/json")
 
 
 @app.get("/problems/{problem_id}")
 def get_problem(problem_id: int, db: Session = Depends(get_db)):
     """Get a single problem by ID."""
-    problem = db.query(Problem).filter(Problem.id == problem_id).first()
+    problem = db.execute(
+        lambda_stmt(lambda: select(Problem).where(Problem.id == problem_id))
+    ).scalar_one_or_none()
     if not problem:
         raise HTTPException(status_code=404, detail="Problem not found")
     
-    return {
+    return ORJSONResponse({
         "id": problem.id,
         "title": problem.title,
         "description": problem.description,
-        "category": problem.category.value,
+        "category": problem.category,
         "source": problem.source,
         "source_id": problem.source_id,
         "source_url": problem.source_url or (f"https://pubmed.ncbi.nlm.nih.gov/{problem.source_id}" if problem.source == "pubmed" and problem.source_id else None)
-    }
+    })
 
-@app.get("/problems/{problem_id}/capabilities", response_model=List[dict])
+@app.get("/problems/{problem_id}/capabilities")
 def get_problem_capabilities(problem_id: int, db: Session = Depends(get_db)):
     """Get capabilities required for a problem."""
-    mappings = db.query(ProblemCapabilityMapping).filter(
+    mappings = db.query(ProblemCapabilityMapping).options(
+        joinedload(ProblemCapabilityMapping.capability)
+    ).filter(
         ProblemCapabilityMapping.problem_id == problem_id
     ).all()
     
-    return [
+    return ORJSONResponse([
         {
             "capability_id": m.capability_id,
             "capability": {
                 "id": m.capability.id,
                 "name": m.capability.name,
                 "description": m.capability.description,
-                "type": m.capability.type.value,
+                "type": m.capability.type,
                 "estimated_cost": m.capability.estimated_cost,
                 "estimated_time": m.capability.estimated_time
             },
@@ -146,10 +202,10 @@ def get_problem_capabilities(problem_id: int, db: Session = Depends(get_db)):
             "is_required": bool(m.is_required)
         }
         for m in mappings
-    ]
+    ])
 
 
-@app.get("/capabilities", response_model=List[dict])
+@app.get("/capabilities")
 def get_capabilities(
     type: Optional[CapabilityType] = None,
     limit: int = Query(100, ge=1, le=1000),
@@ -157,59 +213,51 @@ def get_capabilities(
     db: Session = Depends(get_db)
 ):
     """Get capabilities."""
-    query = db.query(Capability)
-    
+    stmt = _CAPABILITIES_STMT
     if type:
-        query = query.filter(Capability.type == type)
+        stmt += lambda s: s.where(Capability.type == type)
+    stmt += lambda s: s.offset(offset).limit(limit)
     
-    capabilities = query.offset(offset).limit(limit).all()
-    
-    return [
-        {
-            "id": c.id,
-            "name": c.name,
-            "description": c.description,
-            "type": c.type.value,
-            "estimated_cost": c.estimated_cost,
-            "estimated_time": c.estimated_time,
-            "complexity_score": c.complexity_score
-        }
-        for c in capabilities
-    ]
+    # Rows already have the response's keys; orjson writes the enums' values
+    return ORJSONResponse([row._asdict() for row in db.execute(stmt)])
 
 
 @app.get("/capabilities/{capability_id}")
 def get_capability(capability_id: int, db: Session = Depends(get_db)):
     """Get a single capability by ID."""
-    capability = db.query(Capability).filter(Capability.id == capability_id).first()
+    capability = db.execute(
+        lambda_stmt(lambda: select(Capability).where(Capability.id == capability_id))
+    ).scalar_one_or_none()
     if not capability:
         raise HTTPException(status_code=404, detail="Capability not found")
     
-    return {
+    return ORJSONResponse({
         "id": capability.id,
         "name": capability.name,
         "description": capability.description,
-        "type": capability.type.value,
+        "type": capability.type,
         "estimated_cost": capability.estimated_cost,
         "estimated_time": capability.estimated_time,
         "complexity_score": capability.complexity_score
-    }
+    })
 
-@app.get("/capabilities/{capability_id}/resources", response_model=List[dict])
+@app.get("/capabilities/{capability_id}/resources")
 def get_capability_resources(capability_id: int, db: Session = Depends(get_db)):
     """Get resources that could fill a capability."""
-    mappings = db.query(CapabilityResourceMapping).filter(
+    mappings = db.query(CapabilityResourceMapping).options(
+        joinedload(CapabilityResourceMapping.resource)
+    ).filter(
         CapabilityResourceMapping.capability_id == capability_id
     ).order_by(CapabilityResourceMapping.match_score.desc()).all()
     
-    return [
+    return ORJSONResponse([
         {
             "resource_id": m.resource_id,
             "resource": {
                 "id": m.resource.id,
                 "name": m.resource.name,
                 "description": m.resource.description,
-                "type": m.resource.type.value,
+                "type": m.resource.type,
                 "organization": m.resource.organization,
                 "location": m.resource.location,
                 "url": m.resource.url,
@@ -218,10 +266,10 @@ def get_capability_resources(capability_id: int, db: Session = Depends(get_db)):
             "match_score": m.match_score
         }
         for m in mappings
-    ]
+    ])
 
 
-@app.get("/gaps", response_model=List[dict])
+@app.get("/gaps")
 def get_gaps(
     priority: Optional[GapPriority] = None,
     min_blocked_value: Optional[float] = None,
@@ -230,97 +278,274 @@ def get_gaps(
     db: Session = Depends(get_db)
 ):
     """Get infrastructure gaps."""
-    query = db.query(Gap)
-    
+    stmt = _GAPS_STMT
     if priority:
-        query = query.filter(Gap.priority == priority)
+        stmt += lambda s: s.where(Gap.priority == priority)
     
     if min_blocked_value:
-        query = query.filter(Gap.blocked_research_value >= min_blocked_value)
+        stmt += lambda s: s.where(Gap.blocked_research_value >= min_blocked_value)
     
-    gaps = query.order_by(Gap.impact_score.desc()).offset(offset).limit(limit).all()
+    stmt += lambda s: s.order_by(Gap.impact_score.desc()).offset(offset).limit(limit)
     
-    return [
+    gaps = db.execute(stmt).all()
+    
+    return ORJSONResponse([
         {
             "id": g.id,
             "capability_id": g.capability_id,
             "capability": {
-                "id": g.capability.id,
-                "name": g.capability.name,
-                "type": g.capability.type.value
+                "id": g.capability_id,
+                "name": g.capability_name,
+                "type": g.capability_type
             },
             "description": g.description,
             "estimated_cost": g.estimated_cost,
             "estimated_time": g.estimated_time,
             "blocked_research_value": g.blocked_research_value,
             "num_blocked_problems": g.num_blocked_problems,
-            "priority": g.priority.value,
+            "priority": g.priority,
             "impact_score": g.impact_score
         }
         for g in gaps
-    ]
+    ])
+
+
+# Registered before /gaps/{gap_id}, which would otherwise match this path
+@app.get("/gaps/funding-potential")
+def get_gaps_by_funding_potential(
+    top_n: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """Get gaps ranked by funding potential."""
+    return _cached_json(
+        ("funding-potential", top_n),
+        lambda: {"gaps": funding_agent.rank_gaps_by_funding_potential(db, top_n)}
+    )
+
 
 @app.get("/gaps/{gap_id}")
 def get_gap(gap_id: int, db: Session = Depends(get_db)):
     """Get a single gap by ID."""
-    gap = db.query(Gap).filter(Gap.id == gap_id).first()
+    gap = db.execute(
+        lambda_stmt(lambda: select(Gap).options(joinedload(Gap.capability)).where(Gap.id == gap_id))
+    ).scalar_one_or_none()
     if not gap:
         raise HTTPException(status_code=404, detail="Gap not found")
     
-    return {
+    return ORJSONResponse({
         "id": gap.id,
         "capability_id": gap.capability_id,
         "capability": {
             "id": gap.capability.id,
             "name": gap.capability.name,
             "description": gap.capability.description,
-            "type": gap.capability.type.value
+            "type": gap.capability.type
         },
         "description": gap.description,
         "estimated_cost": gap.estimated_cost,
         "estimated_time": gap.estimated_time,
         "blocked_research_value": gap.blocked_research_value,
         "num_blocked_problems": gap.num_blocked_problems,
-        "priority": gap.priority.value,
+        "priority": gap.priority,
         "impact_score": gap.impact_score
-    }
+    })
+
+
+# Streamed responses are sent in chunks of about this many bytes
+_STREAM_CHUNK_SIZE = 64 * 1024
 
 
 @app.get("/matrix/problem-capability")
-def get_problem_capability_matrix(
-    category: Optional[ProblemCategory] = None,
-    db: Session = Depends(get_db)
-):
-    """Get problem-capability matrix."""
-    query = db.query(Problem)
+def get_problem_capability_matrix(request: Request, category: Optional[ProblemCategory] = None):
+    """
+    Get problem-capability matrix.
+    
+    Clients sending "Accept: application/x-ndjson" get one entry per line
+    instead of the JSON document (without the counts).
+    """
+    ndjson = "application/x-ndjson" in request.headers.get("accept", "")
+    media_type = "application/x-ndjson" if ndjson else "application/json"
+    cache_key = (category, ndjson)
+    version = data_version()
+    body = matrix_cache.get(cache_key)
+    if body is not None:
+        return Response(body, media_type=media_type)
+    
+    # One outer join over just the columns we return; problems without any
+    # mappings still come back (with NULL capability columns) so they count
+    # towards num_problems
+    stmt = select(
+        Problem.id,
+        Problem.title,
+        Problem.category,
+        ProblemCapabilityMapping.capability_id,
+        Capability.name,
+        Capability.type,
+        ProblemCapabilityMapping.confidence_score,
+        ProblemCapabilityMapping.is_required
+    ).outerjoin(
+        ProblemCapabilityMapping, ProblemCapabilityMapping.problem_id == Problem.id
+    ).outerjoin(
+        Capability, Capability.id == ProblemCapabilityMapping.capability_id
+    )
     if category:
-        query = query.filter(Problem.category == category)
+        stmt = stmt.filter(Problem.category == category)
+    stmt = stmt.order_by(Problem.id, ProblemCapabilityMapping.id)
+    
+    ensure_db()
+    db, rows = _start_stream(stmt, yield_per=1000)
+    return StreamingResponse(
+        _guarded_stream(
+            _caching_stream(_stream_matrix(db, rows, ndjson), matrix_cache, cache_key, version),
+            error_line=b'{"error": "Matrix stream failed"}\n' if ndjson else b""
+        ),
+        media_type=media_type
+    )
+
+
+def _start_stream(stmt, yield_per: int):
+    """
+    Run a statement for a streamed response and read its first batch of rows.
+    
+    Uses its own session, since the request's may be closed before streaming
+    ends. Errors running the query are raised here, before the response
+    starts, so they still become a 500.
+    
+    Args:
+        stmt: Statement to execute
+        yield_per: Rows fetched per batch
+    
+    Returns:
+        (session, rows) - the generator reading rows closes the session
+    """
+    db = SessionLocal()
+    try:
+        result = db.execute(stmt, execution_options={"yield_per": yield_per})
+        first_rows = result.fetchmany(yield_per)
+    except Exception:
+        db.close()
+        raise
+    return db, chain(first_rows, result)
+
+
+def _guarded_stream(chunks, error_line: bytes = b""):
+    """
+    Pass a streamed body through, logging errors instead of raising them mid-response.
     
-    problems = query.all()
+    The 200 status has already been sent by then, so the body just ends:
+    JSON documents are left unterminated, so clients can't mistake them for
+    a complete result, and NDJSON streams end with error_line.
     
-    matrix = []
-    for problem in problems:
-        mappings = db.query(ProblemCapabilityMapping).filter(
-            ProblemCapabilityMapping.problem_id == problem.id
-        ).all()
+    Args:
+        chunks: Body chunks (bytes)
+        error_line: Written after the last chunk if the stream fails
+    """
+    try:
+        yield from chunks
+    except Exception as e:
+        logging.error(f"Error streaming response: {e}", exc_info=True)
+        if error_line:
+            yield error_line
+
+
+def _stream_rows(db: Session, rows):
+    """
+    Encode rows as a JSON array of objects as they are read.
+    
+    Rows are sent in chunks of about _STREAM_CHUNK_SIZE bytes.
+    
+    Args:
+        db: Session the rows are read through, closed when done
+        rows: Rows from _start_stream
+    """
+    with db:
+        buffer = bytearray(b"[")
+        first = True
+        # Rows already have the response's keys; orjson writes the enums' values
+        for row in rows:
+            if not first:
+                buffer += b","
+            first = False
+            buffer += dumps(row._asdict())
+            
+            if len(buffer) >= _STREAM_CHUNK_SIZE:
+                yield bytes(buffer)
+                buffer.clear()
         
-        for mapping in mappings:
-            matrix.append({
-                "problem_id": problem.id,
-                "problem_title": problem.title,
-                "problem_category": problem.category.value,
-                "capability_id": mapping.capability_id,
-                "capability_name": mapping.capability.name,
-                "capability_type": mapping.capability.type.value,
-                "confidence_score": mapping.confidence_score,
-                "is_required": bool(mapping.is_required)
-            })
+        buffer += b"]"
+        yield bytes(buffer)
+
+
+def _caching_stream(chunks, cache: TTLCache, key, version: int):
+    """
+    Pass a streamed body through, storing it in cache once it completes.
     
-    return {
-        "matrix": matrix,
-        "num_problems": len(problems),
-        "num_entries": len(matrix)
-    }
+    Args:
+        chunks: Body chunks (bytes)
+        cache: Cache to store the complete body in
+        key: Cache key
+        version: Data version read before the body was generated
+    """
+    parts = []
+    for chunk in chunks:
+        parts.append(chunk)
+        yield chunk
+    # Only reached when the whole body was sent, not on client disconnect
+    cache.set(key, b"".join(parts), version)
+
+
+def _stream_matrix(db: Session, rows, ndjson: bool = False):
+    """
+    Encode the matrix response row by row as the join is read.
+    
+    Yields the same JSON document the endpoint used to return, with the
+    counts written after the entries once they are known (or NDJSON lines).
+    Entries are sent in chunks of about _STREAM_CHUNK_SIZE bytes.
+    
+    Args:
+        db: Session the rows are read through, closed when done
+        rows: Rows of the matrix join from _start_stream
+        ndjson: Write one entry per line instead of the JSON document
+    """
+    with db:
+        buffer = bytearray() if ndjson else bytearray(b'{"matrix": [')
+        last_problem_id = None
+        num_problems = 0
+        num_entries = 0
+        for (problem_id, title, problem_category, capability_id, capability_name,
+             capability_type, confidence_score, is_required) in rows:
+            # Rows are ordered by problem, so a new id is a new problem
+            if problem_id != last_problem_id:
+                last_problem_id = problem_id
+                num_problems += 1
+            if capability_name is None:
+                continue
+            
+            if num_entries and not ndjson:
+                buffer += b", "
+            # orjson writes the enums' values itself
+            buffer += orjson.dumps({
+                "problem_id": problem_id,
+                "problem_title": title,
+                "problem_category": problem_category,
+                "capability_id": capability_id,
+                "capability_name": capability_name,
+                "capability_type": capability_type,
+                "confidence_score": confidence_score,
+                "is_required": bool(is_required)
+            })
+            if ndjson:
+                buffer += b"\n"
+            num_entries += 1
+            
+            if len(buffer) >= _STREAM_CHUNK_SIZE:
+                yield bytes(buffer)
+                buffer.clear()
+        
+        if not ndjson:
+            buffer += f'], "num_problems": {num_problems}, "num_entries": {num_entries}}}'.encode()
+        if buffer:
+            yield bytes(buffer)
 
 
 @app.get("/keystone-capabilities")
@@ -329,8 +554,10 @@ def get_keystone_capabilities(
     db: Session = Depends(get_db)
 ):
     """Get keystone capabilities that unlock multiple problems."""
-    keystones = gap_analyzer.find_keystone_capabilities(db, top_n)
-    return {"keystones": keystones}
+    return _cached_json(
+        ("keystone-capabilities", top_n),
+        lambda: {"keystones": gap_analyzer.find_keystone_capabilities(db, top_n)}
+    )
 
 
 @app.get("/duplication-clusters")
@@ -339,207 +566,264 @@ def get_duplication_clusters(
     db: Session = Depends(get_db)
 ):
     """Get duplication clusters where multiple groups are building the same thing."""
-    clusters = coordination_agent.detect_duplication_clusters(db, min_groups)
-    return {"clusters": clusters, "num_clusters": len(clusters)}
+    def compute():
+        clusters = coordination_agent.detect_duplication_clusters(db, min_groups)
+        return {"clusters": clusters, "num_clusters": len(clusters)}
+    
+    return _cached_json(("duplication-clusters", min_groups), compute)
 
 
-@app.get("/gaps/funding-potential")
-def get_gaps_by_funding_potential(
-    top_n: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db)
-):
-    """Get gaps ranked by funding potential."""
-    ranked = funding_agent.rank_gaps_by_funding_potential(db, top_n)
-    return {"gaps": ranked}
+def _cached_json(key, compute) -> Response:
+    """
+    Serve an analysis result from analysis_cache, computing it on a miss.
+    
+    The rendered body is cached, so hits skip serialization as well as the
+    analysis itself.
+    
+    Args:
+        key: Cache key (endpoint name and query parameters)
+        compute: Called without arguments to produce the result on a miss
+    
+    Returns:
+        JSON response with the cached or freshly rendered body
+    """
+    body = analysis_cache.get_or_compute(key, lambda: dumps(compute()))
+    return Response(body, media_type="application/json")
 
 
-# Global state for fetch status
-fetch_status = {"running": False, "progress": 0, "total": 0, "message": ""}
-fetch_lock = threading.Lock()
+def _update_fetch_status(generation: int, **changes) -> bool:
+    """
+    Update the fetch status on behalf of one fetch run.
+    
+    Args:
+        generation: Run the update comes from (see fetch_data_background)
+        **changes: fetch_status fields to set
+    
+    Returns:
+        False (without updating) if that run was cancelled or superseded
+    """
+    with fetch_lock:
+        if generation != _fetch_generation or not fetch_status["running"]:
+            return False
+        fetch_status.update(changes)
+        return True
+
 
 def fetch_data_background():
     """Fetch data in background with proper database connection handling."""
-    global fetch_status
+    global _fetch_generation
     
     with fetch_lock:
         if fetch_status["running"]:
             return
-        fetch_status["running"] = True
-        fetch_status["progress"] = 0
-        fetch_status["total"] = 0
-        fetch_status["message"] = "Starting data fetch..."
+        _fetch_generation += 1
+        generation = _fetch_generation
+        fetch_status.update(running=True, progress=0, total=0, message="Starting data fetch...")
     
     try:
-        from longevity_map.database.session import SessionLocal
         from longevity_map.data_sources import pubmed
         from datetime import datetime, timedelta
         import time
         
         # Create a NEW database session for this background task
+        ensure_db()
         db = SessionLocal()
         
         try:
-            fetch_status["message"] = "Fetching papers from PubMed..."
+            _update_fetch_status(generation, message="Fetching papers from PubMed...")
             
             # Fetch papers first - start with just 3 for speed
             cutoff = datetime.now() - timedelta(days=30)
             papers = pubmed.fetch_recent(cutoff, max_results=3)
             
-            fetch_status["total"] = len(papers)
-            fetch_status["message"] = f"Processing {len(papers)} papers..."
+            _update_fetch_status(generation, total=len(papers), message=f"Processing {len(papers)} papers...")
             
             from longevity_map.agents.problem_parser import ProblemParser
             from longevity_map.agents.capability_extractor import CapabilityExtractor
             from longevity_map.models.problem import Problem
             from longevity_map.models.capability import Capability
             from longevity_map.models.mapping import ProblemCapabilityMapping
-            from sqlalchemy.exc import OperationalError
+            from sqlalchemy.exc import IntegrityError, OperationalError
             
             parser = ProblemParser()
             extractor = CapabilityExtractor()
             
             problems_added = 0
             
-            for i, paper in enumerate(papers, 1):
-                # Check if cancelled
-                if not fetch_status["running"]:
-                    break
-                    
+            # Papers already stored, found with one IN query on the
+            # (source, source_id) index rather than a lookup per paper
+            known_ids = {
+                source_id for (source_id,) in db.query(Problem.source_id).filter(
+                    Problem.source == "pubmed",
+                    Problem.source_id.in_({paper['id'] for paper in papers})
+                )
+            }
+            
+            def extract(i, paper):
+                """Parse one paper and extract its capabilities (in a worker thread)."""
+                # Parse problem
+                problem = parser.process(
+                    paper.get("text", paper.get("abstract", "")),
+                    source="pubmed",
+                    source_id=paper['id']
+                )
+                
+                problem.source_url = f"https://pubmed.ncbi.nlm.nih.gov/{paper['id']}"
+                if paper.get('doi'):
+                    problem.source_url = f"https://doi.org/{paper['doi']}"
+                
+                # Extract capabilities (with timeout protection)
                 try:
-                    fetch_status["progress"] = i
-                    fetch_status["message"] = f"Processing paper {i}/{len(papers)}: {paper['title'][:50]}..."
-                    
-                    # Check if exists
-                    try:
-                        existing = db.query(Problem).filter(
-                            Problem.source == "pubmed",
-                            Problem.source_id == paper['id']
-                        ).first()
-                    except OperationalError:
-                        # DB locked on read, skip this paper
-                        fetch_status["message"] = f"Paper {i}: Database busy, skipping..."
-                        continue
+                    capabilities = extractor.process(problem.description)
+                except Exception as e:
+                    _update_fetch_status(generation, message=f"Paper {i}: Error extracting capabilities: {str(e)[:50]}...")
+                    logging.error(f"Error extracting capabilities for paper {i}: {e}")
+                    capabilities = []
+                
+                return problem, capabilities
+            
+            # Parse and extract every paper before touching the database. The
+            # LLM calls overlap in worker threads; results are collected in
+            # paper order here, and only this thread uses the session
+            parsed = []
+            executor = ThreadPoolExecutor(max_workers=_EXTRACT_WORKERS, thread_name_prefix="fetch-extract")
+            try:
+                futures = {
+                    i: executor.submit(extract, i, paper)
+                    for i, paper in enumerate(papers, 1)
+                    if paper['id'] not in known_ids
+                }
+                for i, paper in enumerate(papers, 1):
+                    # Stop if cancelled
+                    if not _update_fetch_status(
+                        generation,
+                        progress=i,
+                        message=f"Processing paper {i}/{len(papers)}: {paper['title'][:50]}..."
+                    ):
+                        break
                     
-                    if existing:
+                    if i not in futures:
                         continue
                     
-                    # Parse problem
-                    problem = parser.process(
-                        paper.get("text", paper.get("abstract", "")),
-                        source="pubmed",
-                        source_id=paper['id']
-                    )
-                    
-                    problem.source_url = f"https://pubmed.ncbi.nlm.nih.gov/{paper['id']}"
-                    if paper.get('doi'):
-                        problem.source_url = f"https://doi.org/{paper['doi']}"
-                    
-                    # Try to save problem - skip immediately if locked (don't block)
-                    try:
-                        db.add(problem)
-                        db.flush()
-                        problems_added += 1
-                    except OperationalError as e:
-                        if "locked" in str(e).lower():
-                            fetch_status["message"] = f"Paper {i}: Database locked, skipping..."
-                            logging.warning(f"Could not save paper {i}: database locked, skipping")
-                            try:
-                                db.rollback()
-                            except:
-                                pass
-                            continue  # Skip to next paper immediately
-                        else:
-                            raise
-                    
-                    # Extract capabilities (with timeout protection)
                     try:
-                        capabilities = extractor.process(
-                            problem.description,
-                            problem_id=problem.id
-                        )
+                        problem, capabilities = futures[i].result()
+                        parsed.append((i, paper, problem, capabilities))
                     except Exception as e:
-                        fetch_status["message"] = f"Paper {i}: Error extracting capabilities: {str(e)[:50]}..."
-                        logging.error(f"Error extracting capabilities for paper {i}: {e}")
-                        capabilities = []
-                    
-                    for cap in capabilities:
-                        existing_cap = db.query(Capability).filter(
-                            Capability.name == cap.name,
-                            Capability.type == cap.type
-                        ).first()
-                        
-                        if existing_cap:
-                            cap = existing_cap
-                        else:
-                            # Try to save capability, but don't block forever
-                            try:
-                                db.add(cap)
-                                db.flush()
-                            except OperationalError as e:
-                                if "locked" in str(e).lower():
-                                    # Skip this capability if DB is locked
-                                    logging.warning(f"Could not save capability {cap.name}: {e}")
-                                    continue
-                                else:
-                                    raise
-                        
-                        # Create mapping
-                        try:
-                            mapping = ProblemCapabilityMapping(
-                                problem_id=problem.id,
-                                capability_id=cap.id,
-                                confidence_score=0.8
-                            )
-                            db.add(mapping)
-                            db.commit()
-                        except OperationalError as e:
-                            if "locked" in str(e).lower():
-                                # Skip this mapping if DB is locked
-                                logging.warning(f"Could not save mapping: {e}")
-                                try:
-                                    db.rollback()
-                                except:
-                                    pass
-                                continue
-                            else:
-                                raise
-                    
-                except Exception as e:
-                    error_msg = str(e)[:100]
-                    fetch_status["message"] = f"Paper {i}: Error - {error_msg}... (skipping)"
-                    logging.error(f"Error processing paper {i}: {e}", exc_info=True)
-                    try:
-                        db.rollback()
-                    except:
-                        pass
-                    # Create new session
-                    try:
-                        db.close()
-                    except:
-                        pass
-                    db = SessionLocal()
-                    # Update progress even on error
-                    fetch_status["progress"] = i
+                        error_msg = str(e)[:100]
+                        _update_fetch_status(generation, message=f"Paper {i}: Error - {error_msg}... (skipping)")
+                        logging.error(f"Error processing paper {i}: {e}", exc_info=True)
+            finally:
+                # Papers not started yet are dropped if the fetch was cancelled
+                executor.shutdown(wait=False, cancel_futures=True)
+            
+            # Resolve every extracted capability against existing ones with a
+            # single query for the whole fetch; capabilities new to the
+            # database are shared by all papers that mention them
+            capability_keys = {(cap.name, cap.type) for _, _, _, capabilities in parsed for cap in capabilities}
+            capabilities_by_key = {}
+            if capability_keys:
+                for existing_cap in db.query(Capability).filter(
+                    tuple_(Capability.name, Capability.type).in_(capability_keys)
+                ).order_by(Capability.id):
+                    capabilities_by_key.setdefault((existing_cap.name, existing_cap.type), existing_cap)
+            
+            def stage(problem, capabilities):
+                """Add a paper's problem and mappings to the session, returning the mappings."""
+                paper_capabilities = dict.fromkeys(
+                    capabilities_by_key.setdefault((cap.name, cap.type), cap)
+                    for cap in capabilities
+                )
+                
+                # Mappings reference the problem and capabilities directly, so
+                # new rows get their ids in the same flush
+                mappings = [
+                    ProblemCapabilityMapping(
+                        problem=problem,
+                        capability=cap,
+                        confidence_score=0.8
+                    )
+                    for cap in paper_capabilities
+                ]
+                db.add(problem)
+                db.add_all(mappings)
+                return mappings
+            
+            def save(items):
+                """Flush papers in one savepoint, rolling back only that savepoint on error."""
+                mappings = []
+                try:
+                    with db.begin_nested():
+                        for _, _, problem, capabilities in items:
+                            mappings.extend(stage(problem, capabilities))
+                except (OperationalError, IntegrityError):
+                    # Unlink the rolled-back mappings: capabilities shared with
+                    # later papers would otherwise cascade them (and their
+                    # problems) into the next flush
+                    for mapping in mappings:
+                        mapping.problem = None
+                        mapping.capability = None
+                    raise
+            
+            # Save papers in batches, each flushed in its own savepoint: the
+            # flush sends each table's new rows as batched multi-row INSERTs
+            # instead of a round trip per paper, and a failing paper only
+            # costs its batch a retry one paper at a time
+            for start in range(0, len(parsed), _SAVE_BATCH_SIZE):
+                batch = parsed[start:start + _SAVE_BATCH_SIZE]
+                
+                # Stop if cancelled
+                if not _update_fetch_status(
+                    generation,
+                    message=f"Saving papers {start + 1}-{start + len(batch)} of {len(parsed)}..."
+                ):
+                    break
+                
+                try:
+                    save(batch)
+                    problems_added += len(batch)
                     continue
+                except (OperationalError, IntegrityError) as e:
+                    # Give up immediately if locked (don't block); the papers
+                    # are picked up again by the next fetch
+                    if "locked" in str(e).lower():
+                        _update_fetch_status(generation, message=f"Database locked, skipping {len(batch)} papers...")
+                        logging.warning(f"Could not save {len(batch)} papers: database locked, skipping")
+                        continue
+                    logging.warning(f"Could not save papers {start + 1}-{start + len(batch)}, retrying one at a time: {e}")
+                
+                for item in batch:
+                    try:
+                        save([item])
+                        problems_added += 1
+                    except (OperationalError, IntegrityError) as e:
+                        i = item[0]
+                        _update_fetch_status(generation, message=f"Paper {i}: Database error - {str(e)[:100]}... (skipping)")
+                        logging.error(f"Could not save paper {i}: {e}")
             
-            fetch_status["message"] = f"Completed! Added {problems_added} problems."
+            if problems_added:
+                db.commit()
             
+            _update_fetch_status(generation, message=f"Completed! Added {problems_added} problems.")
+        
         finally:
             db.close()
-            
+    
     except Exception as e:
         error_msg = str(e)[:200]
-        fetch_status["message"] = f"Error: {error_msg}"
+        _update_fetch_status(generation, message=f"Error: {error_msg}")
         logging.error(f"Background fetch error: {e}", exc_info=True)
     finally:
         try:
             db.close()
         except:
             pass
+        # Cached analysis results may be stale now
+        bump_data_version()
         with fetch_lock:
-            fetch_status["running"] = False
-            if fetch_status["progress"] == 0:
-                fetch_status["message"] = "Failed to start. Check API server logs."
+            if generation == _fetch_generation:
+                fetch_status["running"] = False
+                if fetch_status["progress"] == 0:
+                    fetch_status["message"] = "Failed to start. Check API server logs."
 
 @app.get("/search")
 def conversational_search(query: str = Query(..., description="Natural language search query"), db: Session = Depends(get_db)):
@@ -570,8 +854,6 @@ def conversational_search(query: str = Query(..., description="Natural language
 @app.post("/fetch-data")
 def trigger_fetch_data(background_tasks: BackgroundTasks):
     """Trigger data fetch from sources (runs in background seamlessly)."""
-    global fetch_status
-    
     with fetch_lock:
         if fetch_status["running"]:
             return {
@@ -592,20 +874,19 @@ def trigger_fetch_data(background_tasks: BackgroundTasks):
 @app.get("/fetch-status")
 def get_fetch_status():
     """Get the status of the background data fetch."""
-    return {
-        "running": fetch_status["running"],
-        "progress": fetch_status["progress"],
-        "total": fetch_status["total"],
-        "message": fetch_status["message"]
-    }
+    # Copied under the lock so the fields are from one consistent update
+    with fetch_lock:
+        return dict(fetch_status)
 
 
 @app.post("/fetch-cancel")
 def cancel_fetch():
     """Cancel the running fetch (if stuck)."""
-    global fetch_status
+    global _fetch_generation
     with fetch_lock:
         if fetch_status["running"]:
+            # The cancelled run stops at its next status update
+            _fetch_generation += 1
             fetch_status["running"] = False
             fetch_status["message"] = "Cancelled by user"
             return {"status": "cancelled", "message": "Fetch cancelled"}
@@ -616,20 +897,26 @@ def get_stats(db: Session = Depends(get_db)):
     """Get overall statistics."""
     from sqlalchemy import func
     
-    num_problems = db.query(func.count(Problem.id)).scalar()
-    num_capabilities = db.query(func.count(Capability.id)).scalar()
-    num_resources = db.query(func.count(Resource.id)).scalar()
-    num_gaps = db.query(func.count(Gap.id)).scalar()
-    
-    total_blocked_value = db.query(func.sum(Gap.blocked_research_value)).scalar() or 0
+    # All five aggregates as scalar subqueries of a single SELECT; plain
+    # COUNT(*) lets the database count from the smallest index
+    num_problems, num_capabilities, num_resources, num_gaps, total_blocked_value = db.execute(
+        select(
+            select(func.count()).select_from(Problem).scalar_subquery(),
+            select(func.count()).select_from(Capability).scalar_subquery(),
+            select(func.count()).select_from(Resource).scalar_subquery(),
+            select(func.count()).select_from(Gap).scalar_subquery(),
+            select(func.sum(Gap.blocked_research_value)).scalar_subquery()
+        )
+    ).one()
+    total_blocked_value = total_blocked_value or 0
     
-    return {
+    return ORJSONResponse({
         "num_problems": num_problems,
         "num_capabilities": num_capabilities,
         "num_resources": num_resources,
         "num_gaps": num_gaps,
         "total_blocked_research_value": total_blocked_value
-    }
+    })
 
 
 if __name__ == "__main__":
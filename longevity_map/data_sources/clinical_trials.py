@@ -3,7 +3,24 @@
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 import requests
-import json
+import orjson
+import threading
+
+# ClinicalTrials.gov API
+_BASE_URL = "https://clinicaltrials.gov/api/v2/studies"
+
+# One HTTP session per thread, so repeated fetches reuse their keep-alive
+# connection (and TLS handshake) instead of opening a new one per call
+_local = threading.local()
+
+
+def _session() -> requests.Session:
+    """HTTP session for the current thread, created on first use."""
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        _local.session = session
+    return session
 
 
 def fetch_recent(cutoff_date: datetime, max_results: int = 500) -> List[Dict[str, Any]]:
@@ -17,9 +34,6 @@ def fetch_recent(cutoff_date: datetime, max_results: int = 500) -> List[Dict[str
     Returns:
         List of trial dictionaries
     """
-    # ClinicalTrials.gov API
-    base_url = "https://clinicaltrials.gov/api/v2/studies"
-    
     # Search for aging-related trials
     query = {
         "query.cond": "aging OR longevity OR senescence",
@@ -30,10 +44,11 @@ def fetch_recent(cutoff_date: datetime, max_results: int = 500) -> List[Dict[str
     trials = []
     
     try:
-        response = requests.get(base_url, params=query, timeout=30)
+        response = _session().get(_BASE_URL, params=query, timeout=30)
         response.raise_for_status()
         
-        data = response.json()
+        # orjson parses the multi-MB study payloads several times faster than json
+        data = orjson.loads(response.content)
         
         for study in data.get("studies", []):
             protocol = study.get("protocolSection", {})
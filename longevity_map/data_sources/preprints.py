@@ -1,56 +1,121 @@
 """Preprint data source integration (bioRxiv, medRxiv)."""
 
 from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import re
+import orjson
 import requests
-import json
+import threading
+
+# bioRxiv/medRxiv API; the date interval and cursor are path segments
+_BASE_URL = "https://api.biorxiv.org/details"
+
+# The API returns this many preprints per cursor window
+_PAGE_SIZE = 100
+
+# Maximum number of windows requested at once
+_MAX_WORKERS = 8
+
+# bioRxiv/medRxiv servers to fetch from
+_SERVERS = ("biorxiv", "medrxiv")
+
+# The details API has no search, so preprints are filtered here to those
+# mentioning these terms in their title or abstract
+_AGING_RE = re.compile(r"\b(aging|ageing|longevity|senescence|gerontology)\b", re.IGNORECASE)
+
+# One HTTP session per thread, so repeated fetches reuse their keep-alive
+# connection (and TLS handshake) instead of opening a new one per call
+_local = threading.local()
+
+
+def _session() -> requests.Session:
+    """HTTP session for the current thread, created on first use."""
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        _local.session = session
+    return session
 
 
 def fetch_recent(cutoff_date: datetime, max_results: int = 500) -> List[Dict[str, Any]]:
     """
     Fetch recent aging-related preprints from bioRxiv/medRxiv.
     
+    Every server's cursor windows are requested concurrently, so the fetch
+    takes about as long as the slowest request rather than their sum.
+    
     Args:
         cutoff_date: Only fetch preprints after this date
-        max_results: Maximum number of results
-        
+        max_results: Maximum number of results per server
+    
     Returns:
         List of preprint dictionaries
     """
     preprints = []
     
-    # bioRxiv/medRxiv API
-    servers = ["biorxiv", "medrxiv"]
+    # Convert date to format needed by API
+    date_str = cutoff_date.strftime("%Y-%m-%d")
+    today = datetime.now().strftime("%Y-%m-%d")
+    
+    windows = [
+        (server, cursor)
+        for server in _SERVERS
+        for cursor in range(0, max_results, _PAGE_SIZE)
+    ]
+    if not windows:
+        return preprints
     
-    for server in servers:
-        try:
-            base_url = f"https://api.biorxiv.org/details/{server}"
-            
-            # Convert date to format needed by API
-            date_str = cutoff_date.strftime("%Y-%m-%d")
-            
-            query = {
-                "query": "aging OR longevity OR senescence",
-                "start": 0,
-                "num": min(max_results, 100)
-            }
-            
-            response = requests.get(base_url, params=query, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            for paper in data.get("collection", []):
+    with ThreadPoolExecutor(max_workers=min(_MAX_WORKERS, len(windows))) as pool:
+        pages = pool.map(lambda window: _fetch_window(window[0], date_str, today, window[1]), windows)
+        
+        counts = dict.fromkeys(_SERVERS, 0)
+        # Each version of a preprint is listed separately; keep the first
+        seen_dois = set()
+        for (server, _), page in zip(windows, pages):
+            for paper in page:
+                if counts[server] >= max_results:
+                    break
+                doi = paper.get("doi", "")
+                if doi in seen_dois:
+                    continue
+                if not _AGING_RE.search(f"{paper.get('title') or ''}\n{paper.get('abstract') or ''}"):
+                    continue
+                
                 preprint = _parse_preprint(paper, server)
                 if preprint:
                     preprints.append(preprint)
-        
-        except Exception as e:
-            print(f"Error fetching from {server}: {e}")
+                    seen_dois.add(doi)
+                    counts[server] += 1
     
     return preprints
 
 
+def _fetch_window(server: str, start: str, end: str, cursor: int) -> List[Dict[str, Any]]:
+    """
+    Fetch one cursor window of preprints posted between two dates.
+    
+    Args:
+        server: "biorxiv" or "medrxiv"
+        start: First date (YYYY-MM-DD)
+        end: Last date (YYYY-MM-DD)
+        cursor: Offset of the first preprint in the window
+    
+    Returns:
+        Raw preprint records (empty on error or past the last window)
+    """
+    try:
+        response = _session().get(f"{_BASE_URL}/{server}/{start}/{end}/{cursor}", timeout=30)
+        response.raise_for_status()
+        
+        data = orjson.loads(response.content)
+        return data.get("collection", [])
+    
+    except Exception as e:
+        print(f"Error fetching from {server}: {e}")
+        return []
+
+
 def fetch_all(max_results: int = 1000) -> List[Dict[str, Any]]:
     """Fetch all aging-related preprints."""
     return fetch_recent(datetime(2020, 1, 1), max_results)
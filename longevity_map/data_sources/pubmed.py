@@ -1,31 +1,43 @@
 """PubMed/PMC data source integration."""
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from itertools import islice
+from xml.etree import ElementTree
 from Bio import Entrez
-import yaml
-from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import io
+import requests
+import threading
 import time
 
+from longevity_map.utils.config import default_config_path, load_config
+from longevity_map.utils.pubmed_cache import PubMedRecordCache
+
 
 def _load_config() -> Dict[str, Any]:
     """Load configuration."""
-    config_path = Path(__file__).parent.parent.parent / "config" / "config.yaml"
-    if not config_path.exists():
-        config_path = Path(__file__).parent.parent.parent / "config" / "config.example.yaml"
+    config_path = default_config_path()
     
     try:
         if config_path.exists():
-            with open(config_path, 'r') as f:
-                return yaml.safe_load(f) or {}
+            return load_config(config_path)
         else:
             return {}
     except Exception:
         return {}
 
 
-def _setup_entrez():
-    """Setup Entrez with API credentials."""
+def _setup_entrez() -> Dict[str, Any]:
+    """
+    Setup Entrez with API credentials.
+    
+    Returns:
+        The configuration the credentials were read from
+    """
     config = _load_config()
     api_config = config.get("api_keys", {}).get("pubmed", {})
     
@@ -42,6 +54,103 @@ def _setup_entrez():
     
     # Set tool parameter (required by NCBI policy for registered tools)
     Entrez.tool = "LongevityR&DMap"
+    
+    return config
+
+
+# NCBI E-utilities
+_EUTILS_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
+
+# NCBI asks for POST rather than GET above this many ids
+_POST_MIN_IDS = 200
+
+# Earliest time the next E-utility request may start, shared by all threads
+# so concurrent fetches stay within NCBI's rate limit together
+_next_request_time = 0.0
+_rate_lock = threading.Lock()
+
+# One HTTP session per thread, so every esearch/efetch reuses its keep-alive
+# connection (and TLS handshake) instead of Entrez opening a new one per call
+_local = threading.local()
+
+
+def _session() -> requests.Session:
+    """HTTP session for the current thread, created on first use."""
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        # Transient NCBI errors and rate-limit responses are retried with backoff
+        retry = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                      allowed_methods=["GET", "POST"])
+        session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=10, max_retries=retry))
+        _local.session = session
+    return session
+
+
+def _throttle():
+    """Wait for this request's slot under NCBI's rate limit."""
+    global _next_request_time
+    # With API key: 10 req/s, without: 3 req/s
+    interval = 0.1 if Entrez.api_key else 0.34
+    with _rate_lock:
+        now = time.monotonic()
+        start = max(now, _next_request_time)
+        _next_request_time = start + interval
+    if start > now:
+        time.sleep(start - now)
+
+
+def _eutils(utility: str, **params) -> io.BytesIO:
+    """
+    Call an E-utility with the Entrez credentials set by _setup_entrez.
+    
+    Args:
+        utility: E-utility name, e.g. "esearch" or "efetch"
+        **params: Query parameters (a list of ids is sent comma-separated)
+    
+    Returns:
+        Response body as a binary file object
+    """
+    if isinstance(params.get("id"), list):
+        params["id"] = ",".join(params["id"])
+    params["tool"] = Entrez.tool
+    if Entrez.email:
+        params["email"] = Entrez.email
+    if Entrez.api_key:
+        params["api_key"] = Entrez.api_key
+    
+    url = f"{_EUTILS_URL}/{utility}.fcgi"
+    _throttle()
+    if params.get("id", "").count(",") + 1 >= _POST_MIN_IDS:
+        response = _session().post(url, data=params, timeout=60)
+    else:
+        response = _session().get(url, params=params, timeout=60)
+    response.raise_for_status()
+    return io.BytesIO(response.content)
+
+
+# Fetched records, shared by every crawl in this process
+_record_cache: Optional[PubMedRecordCache] = None
+_record_cache_lock = threading.Lock()
+
+
+def _get_record_cache(config: Dict[str, Any]) -> PubMedRecordCache:
+    """PubMed record cache, opened on first use."""
+    global _record_cache
+    with _record_cache_lock:
+        if _record_cache is None:
+            pubmed_config = config.get("data_sources", {}).get("pubmed", {})
+            _record_cache = PubMedRecordCache(
+                pubmed_config.get("cache_path"),
+                max_age=pubmed_config.get("cache_max_age_days", 7) * 24 * 3600
+            )
+        return _record_cache
+
+
+_QUERY = (
+    "(aging OR ageing OR longevity OR senescence OR gerontology) "
+    "AND (research OR study OR intervention OR mechanism)"
+)
 
 
 def fetch_recent(cutoff_date: datetime, max_results: int = 1000) -> List[Dict[str, Any]]:
@@ -51,165 +160,198 @@ def fetch_recent(cutoff_date: datetime, max_results: int = 1000) -> List[Dict[st
     Args:
         cutoff_date: Only fetch papers after this date
         max_results: Maximum number of results to fetch
-        
+    
     Returns:
         List of paper dictionaries
     """
-    _setup_entrez()
+    return list(fetch_recent_iter(cutoff_date, max_results))
+
+
+def fetch_recent_iter(cutoff_date: datetime, max_results: int = 1000) -> Iterator[Dict[str, Any]]:
+    """
+    Yield recent aging-related papers from PubMed as each page is fetched.
     
-    # Search query for aging-related papers
-    query = (
-        "(aging OR ageing OR longevity OR senescence OR gerontology) "
-        "AND (research OR study OR intervention OR mechanism)"
-    )
+    Args:
+        cutoff_date: Only fetch papers after this date
+        max_results: Maximum number of results to fetch
     
+    Yields:
+        Paper dictionaries
+    """
     # Date filter - format: YYYY/MM/DD[PDAT]
     date_str = cutoff_date.strftime("%Y/%m/%d")
     today_str = datetime.now().strftime("%Y/%m/%d")
-    query += f" AND ({date_str}[PDAT] : {today_str}[PDAT])"
+    query = _QUERY + f" AND ({date_str}[PDAT] : {today_str}[PDAT])"
     
-    papers = []
+    yield from _iter_papers(query, max_results)
+
+
+def fetch_all(max_results: int = 10000) -> List[Dict[str, Any]]:
+    """Fetch all aging-related papers (no date filter)."""
+    return list(fetch_all_iter(max_results))
+
+
+def fetch_all_iter(max_results: int = 10000) -> Iterator[Dict[str, Any]]:
+    """Yield all aging-related papers (no date filter) as each page is fetched."""
+    yield from _iter_papers(_QUERY, max_results)
+
+
+def _iter_papers(query: str, max_results: int) -> Iterator[Dict[str, Any]]:
+    """
+    Search PubMed and yield parsed papers one efetch page at a time.
+    
+    Papers cached by earlier crawls come first, in search order. The rest are
+    uploaded once with EPost and fetched as retstart windows of that history
+    set, a few at a time on worker threads (all requests share the rate limit
+    in _throttle), and yielded in window order.
+    """
+    config = _setup_entrez()
+    
+    # As many requests in flight as NCBI allows per second
+    workers = 10 if Entrez.api_key else 3
+    batch_size = config.get("data_sources", {}).get("pubmed", {}).get("batch_size", 500)
     
     try:
         # Search
-        search_handle = Entrez.esearch(
+        search_results = Entrez.read(_eutils(
+            "esearch",
             db="pubmed",
             term=query,
             retmax=max_results,
             sort="pub_date"
-        )
-        search_results = Entrez.read(search_handle)
-        search_handle.close()
+        ))
         
         pmids = search_results["IdList"]
         
-        if not pmids:
-            return papers
+        cache = _get_record_cache(config)
+        cached = cache.cached_pmids(pmids)
+        missing = [pmid for pmid in pmids if pmid not in cached]
         
-        # Fetch details in batches
-        batch_size = 100
-        for i in range(0, len(pmids), batch_size):
-            batch = pmids[i:i+batch_size]
-            
-            fetch_handle = Entrez.efetch(
-                db="pubmed",
-                id=",".join(batch),
-                retmode="xml"
-            )
-            articles = Entrez.read(fetch_handle)
-            fetch_handle.close()
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pubmed-efetch")
+        try:
+            # Start fetching the missing records, keeping at most `workers`
+            # windows ahead of the consumer
+            pending = deque()
+            windows = iter(())
+            if missing:
+                webenv, query_key = _post_ids(missing)
+                windows = (
+                    executor.submit(_fetch_window, webenv, query_key, retstart, batch_size, cache)
+                    for retstart in range(0, len(missing), batch_size)
+                )
+                pending.extend(islice(windows, workers))
             
-            # Parse articles
-            for article in articles["PubmedArticle"]:
-                paper = _parse_article(article)
-                if paper:
-                    papers.append(paper)
+            # Meanwhile serve the cached records
+            for i in range(0, len(pmids), batch_size):
+                yield from _cached_papers([pmid for pmid in pmids[i:i+batch_size] if pmid in cached], cache)
             
-            # Rate limiting - with API key: 10 req/s, without: 3 req/s
-            # Use 0.1s (10 req/s) if API key is set, otherwise 0.34s (3 req/s)
-            config = _load_config()
-            api_key = config.get("api_keys", {}).get("pubmed", {}).get("api_key", "").strip()
-            sleep_time = 0.1 if api_key else 0.34
-            time.sleep(sleep_time)
+            while pending:
+                papers = pending.popleft().result()
+                pending.extend(islice(windows, 1))
+                
+                yield from papers
+        finally:
+            # Windows not started yet are dropped if the caller stops early
+            executor.shutdown(wait=False, cancel_futures=True)
     
     except Exception as e:
         print(f"Error fetching from PubMed: {e}")
+
+
+def _post_ids(pmids: List[str]) -> Tuple[str, str]:
+    """
+    Upload PMIDs to the Entrez history server with EPost.
     
-    return papers
+    Returns:
+        (WebEnv, query_key) identifying the uploaded set
+    """
+    result = ElementTree.parse(_eutils("epost", db="pubmed", id=pmids)).getroot()
+    error = result.findtext("ERROR")
+    if error:
+        raise RuntimeError(f"EPost failed: {error}")
+    return result.findtext("WebEnv"), result.findtext("QueryKey")
 
 
-def fetch_all(max_results: int = 10000) -> List[Dict[str, Any]]:
-    """Fetch all aging-related papers (no date filter)."""
-    _setup_entrez()
+def _fetch_window(webenv: str, query_key: str, retstart: int, retmax: int,
+                  cache: PubMedRecordCache) -> List[Dict[str, Any]]:
+    """
+    Fetch one retstart window of an EPost history set and parse it.
     
-    query = (
-        "(aging OR ageing OR longevity OR senescence OR gerontology) "
-        "AND (research OR study OR intervention OR mechanism)"
+    The XML is stream-parsed one PubmedArticle at a time, and each article is
+    discarded once parsed (and cached), instead of building the whole
+    document with Entrez.read.
+    """
+    papers = []
+    fetched = []
+    body = _eutils(
+        "efetch",
+        db="pubmed",
+        WebEnv=webenv,
+        query_key=query_key,
+        retstart=retstart,
+        retmax=retmax,
+        retmode="xml"
     )
-    
+    for _, elem in ElementTree.iterparse(body, events=("end",)):
+        if elem.tag != "PubmedArticle":
+            continue
+        paper = _parse_article(elem)
+        if paper:
+            papers.append(paper)
+            fetched.append((paper["id"], ElementTree.tostring(elem)))
+        elem.clear()
+    cache.put_many(fetched)
+    return papers
+
+
+def _cached_papers(pmids: List[str], cache: PubMedRecordCache) -> List[Dict[str, Any]]:
+    """Parse cached records, in the order of pmids."""
+    cached = cache.get_many(pmids)
     papers = []
-    
-    try:
-        search_handle = Entrez.esearch(
-            db="pubmed",
-            term=query,
-            retmax=max_results,
-            sort="pub_date"
-        )
-        search_results = Entrez.read(search_handle)
-        search_handle.close()
-        
-        pmids = search_results["IdList"]
-        
-        # Fetch in batches
-        batch_size = 100
-        for i in range(0, len(pmids), batch_size):
-            batch = pmids[i:i+batch_size]
-            
-            fetch_handle = Entrez.efetch(
-                db="pubmed",
-                id=",".join(batch),
-                retmode="xml"
-            )
-            articles = Entrez.read(fetch_handle)
-            fetch_handle.close()
-            
-            for article in articles["PubmedArticle"]:
-                paper = _parse_article(article)
-                if paper:
-                    papers.append(paper)
-            
-            # Rate limiting
-            config = _load_config()
-            api_key = config.get("api_keys", {}).get("pubmed", {}).get("api_key", "").strip()
-            sleep_time = 0.1 if api_key else 0.34
-            time.sleep(sleep_time)
-    
-    except Exception as e:
-        print(f"Error fetching from PubMed: {e}")
-    
+    for pmid in pmids:
+        if pmid in cached:
+            paper = _parse_article(ElementTree.fromstring(cached[pmid]))
+            if paper:
+                papers.append(paper)
     return papers
 
 
-def _parse_article(article: Any) -> Optional[Dict[str, Any]]:
-    """Parse a PubMed article into our format."""
+def _text(elem: Optional[ElementTree.Element]) -> str:
+    """Text of an element including any inline markup's text ("" if missing)."""
+    return "".join(elem.itertext()) if elem is not None else ""
+
+
+def _parse_article(article: ElementTree.Element) -> Optional[Dict[str, Any]]:
+    """Parse a PubmedArticle element into our format."""
     try:
-        medline = article["MedlineCitation"]
-        pmid = str(medline["PMID"])
+        medline = article.find("MedlineCitation")
+        pmid = medline.findtext("PMID").strip()
         
         # Get title
-        article_data = medline.get("Article", {})
-        title = ""
-        if "ArticleTitle" in article_data:
-            title = str(article_data["ArticleTitle"])
+        article_data = medline.find("Article")
+        if article_data is None:
+            article_data = ElementTree.Element("Article")
+        title = _text(article_data.find("ArticleTitle"))
         
         # Get abstract
-        abstract = ""
-        if "Abstract" in article_data and "AbstractText" in article_data["Abstract"]:
-            abstract_texts = article_data["Abstract"]["AbstractText"]
-            if isinstance(abstract_texts, list):
-                abstract = " ".join(str(t) for t in abstract_texts)
-            else:
-                abstract = str(abstract_texts)
+        abstract = " ".join(_text(t) for t in article_data.iterfind("Abstract/AbstractText"))
         
         # Get publication date
         pub_date = None
-        if "ArticleDate" in article_data:
-            date = article_data["ArticleDate"]
+        date = article_data.find("ArticleDate")
+        if date is not None:
             try:
-                year = int(date.get("Year", 2000))
-                month = int(date.get("Month", 1))
-                day = int(date.get("Day", 1))
+                year = int(date.findtext("Year", 2000))
+                month = int(date.findtext("Month", 1))
+                day = int(date.findtext("Day", 1))
                 pub_date = datetime(year, month, day)
             except:
                 pass
         
         # Get DOI
         doi = ""
-        if "ELocationID" in article_data:
-            for eloc in article_data["ELocationID"]:
-                if eloc.attributes.get("EIdType") == "doi":
-                    doi = str(eloc)
+        for eloc in article_data.iterfind("ELocationID[@EIdType='doi']"):
+            doi = _text(eloc)
         
         return {
             "id": pmid,
@@ -224,4 +366,3 @@ def _parse_article(article: Any) -> Optional[Dict[str, Any]]:
     except Exception as e:
         print(f"Error parsing article: {e}")
         return None
-
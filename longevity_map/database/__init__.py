@@ -1,7 +1,14 @@
 """Database setup and session management."""
 
-from .session import get_db, init_db, engine
-from .base import Base
+from .session import get_db, init_db, ensure_db
+from .base import Base, get_engine
 
-__all__ = ["get_db", "init_db", "engine", "Base"]
+__all__ = ["get_db", "init_db", "ensure_db", "engine", "get_engine", "Base"]
+
+
+def __getattr__(name: str):
+    """Create the engine only when it is first accessed."""
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
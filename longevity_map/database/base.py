@@ -2,43 +2,52 @@
 
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
+from typing import Any, Dict, Optional
+import logging
 import os
-from pathlib import Path
-import yaml
-
-# Load configuration with error handling
-config_path = Path(__file__).parent.parent.parent / "config" / "config.yaml"
-if not config_path.exists():
-    config_path = Path(__file__).parent.parent.parent / "config" / "config.example.yaml"
-
-try:
-    if config_path.exists():
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f) or {}
-    else:
-        # If no config file exists, use defaults
-        config = {}
-        import logging
-        logging.warning("No config file found, using defaults")
-except Exception as e:
-    import logging
-    logging.warning(f"Could not load config: {e}, using defaults")
-    config = {}
+import threading
 
-db_config = config.get("database", {})
+from longevity_map.utils.config import default_config_path, load_config
 
 # Create base for models
 Base = declarative_base()
 
-# Database URL
-if db_config.get("type") == "postgresql":
-    pg_config = db_config.get("postgresql", {})
-    DATABASE_URL = (
-        f"postgresql://{pg_config.get('user')}:{pg_config.get('password')}"
-        f"@{pg_config.get('host')}:{pg_config.get('port')}/{pg_config.get('database')}"
-    )
-else:
+# The engine is built on first use rather than at import, so importing the
+# models (e.g. on a serverless cold start) doesn't read the config or set up
+# the connection pool
+_engine: Optional[Engine] = None
+_engine_lock = threading.Lock()
+
+
+def _load_db_config() -> Dict[str, Any]:
+    """Database section of the configuration (empty if unavailable)."""
+    config_path = default_config_path()
+    
+    try:
+        if config_path.exists():
+            config = load_config(config_path)
+        else:
+            # If no config file exists, use defaults
+            config = {}
+            logging.warning("No config file found, using defaults")
+    except Exception as e:
+        logging.warning(f"Could not load config: {e}, using defaults")
+        config = {}
+    
+    return config.get("database", {})
+
+
+def _database_url(db_config: Dict[str, Any]) -> str:
+    """Database URL for the configured backend."""
+    if db_config.get("type") == "postgresql":
+        pg_config = db_config.get("postgresql", {})
+        return (
+            f"postgresql://{pg_config.get('user')}:{pg_config.get('password')}"
+            f"@{pg_config.get('host')}:{pg_config.get('port')}/{pg_config.get('database')}"
+        )
+    
     # SQLite default
     # For Vercel/serverless, use /tmp directory (writable in serverless)
     if os.environ.get("VERCEL") or os.environ.get("AWS_LAMBDA_FUNCTION_NAME"):
@@ -53,22 +62,44 @@ else:
                 os.makedirs(db_dir, exist_ok=True)
             except Exception:
                 pass  # Will fail on first use if directory can't be created
-    DATABASE_URL = f"sqlite:///{db_path}"
+    return f"sqlite:///{db_path}"
+
 
-# SQLite connection args for better concurrency
-if "sqlite" in DATABASE_URL:
+def _create_engine() -> Engine:
+    """Create the engine for the configured database."""
+    db_config = _load_db_config()
+    database_url = _database_url(db_config)
+    
+    # Pooled connections are reused across requests, so the connect handshake
+    # (and for SQLite the pragmas below) runs once per connection, not per request
+    pool_options = {
+        "pool_size": db_config.get("pool_size", 20),
+        "max_overflow": db_config.get("max_overflow", 20),
+        "pool_timeout": db_config.get("pool_timeout", 30),
+    }
+    
+    if "sqlite" not in database_url:
+        return create_engine(
+            database_url,
+            pool_pre_ping=True,
+            pool_recycle=db_config.get("pool_recycle", 1800),  # Before server-side idle timeouts
+            query_cache_size=1200,
+            **pool_options
+        )
+    
+    # SQLite connection args for better concurrency
     connect_args = {
         "check_same_thread": False,
         "timeout": 60.0,  # Wait up to 60 seconds for lock
     }
     # Enable WAL mode for better concurrency (allows concurrent reads and writes)
-    # Use NullPool to avoid connection pool issues with SQLite
-    from sqlalchemy.pool import NullPool
+    # check_same_thread=False lets pooled connections move between request threads
     engine = create_engine(
-        DATABASE_URL, 
+        database_url, 
         connect_args=connect_args, 
-        poolclass=NullPool,  # No connection pooling for SQLite - each request gets new connection
-        pool_pre_ping=False
+        pool_pre_ping=False,  # Local file, nothing to go stale
+        query_cache_size=1200,  # Room for every endpoint's filter combinations in the compiled SQL cache
+        **pool_options
     )
     
     # Enable WAL mode after engine creation - this allows concurrent reads/writes
@@ -76,20 +107,58 @@ if "sqlite" in DATABASE_URL:
     def set_sqlite_pragma(dbapi_conn, connection_record):
         try:
             cursor = dbapi_conn.cursor()
+            # Only takes effect for a new database file (before WAL is enabled)
+            cursor.execute("PRAGMA page_size=8192")
             # WAL mode allows multiple readers and one writer simultaneously
             cursor.execute("PRAGMA journal_mode=WAL")
             cursor.execute("PRAGMA synchronous=NORMAL")  # Faster than FULL, still safe
             cursor.execute("PRAGMA busy_timeout=60000")  # 60 second timeout
             cursor.execute("PRAGMA wal_autocheckpoint=1000")  # Auto-checkpoint
+            cursor.execute("PRAGMA cache_size=-65536")  # 64 MB page cache per connection
+            cursor.execute("PRAGMA temp_store=MEMORY")  # Sorts and temp indexes stay in memory
+            # Read pages straight from a memory map instead of copying them
+            # through read() calls; skipped on serverless, where mmap of /tmp
+            # may be restricted
+            if not (os.environ.get("VERCEL") or os.environ.get("AWS_LAMBDA_FUNCTION_NAME")):
+                cursor.execute("PRAGMA mmap_size=268435456")  # 256 MB
             cursor.close()
         except Exception:
             # If database is locked, these pragmas will fail
             # That's okay - the connection will still work with retries
             pass
-else:
-    engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+    
+    return engine
+
+
+def get_engine() -> Engine:
+    """Database engine, created on first use."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = _create_engine()
+    return _engine
+
+
+class _LazySessionmaker(sessionmaker):
+    """sessionmaker that binds to the engine when the first session is made."""
+    
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None:
+            self.configure(bind=get_engine())
+        return super().__call__(**local_kw)
+
+
+SessionLocal = _LazySessionmaker(autocommit=False, autoflush=False)
+
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def __getattr__(name: str):
+    """Keep engine and DATABASE_URL importable as module attributes."""
+    if name == "engine":
+        return get_engine()
+    if name == "DATABASE_URL":
+        return _database_url(_load_db_config())
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def import_models():
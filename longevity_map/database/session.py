@@ -1,6 +1,11 @@
 """Database session management."""
 
-from .base import engine, SessionLocal, Base, import_models
+from functools import lru_cache
+import threading
+
+from .base import get_engine, SessionLocal, Base, import_models
+
+_ensure_db_lock = threading.Lock()
 
 
 def init_db():
@@ -8,8 +13,14 @@ def init_db():
     try:
         # Import models first to register them with Base
         import_models()
+        engine = get_engine()
         # Create all tables (will fail gracefully if database is locked or unavailable)
         Base.metadata.create_all(bind=engine)
+        # create_all only builds indexes together with new tables, so add any
+        # index declared since an existing database was created
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=engine, checkfirst=True)
     except Exception as e:
         # Don't raise - database will be created on first use
         import logging
@@ -20,8 +31,22 @@ def init_db():
             raise
 
 
+@lru_cache(maxsize=1)
+def _init_db_once():
+    """Run init_db, caching success so later calls are free."""
+    init_db()
+
+
+def ensure_db():
+    """Initialize the database on first use; a no-op once it has succeeded."""
+    # Lock so concurrent first requests initialize exactly once
+    with _ensure_db_lock:
+        _init_db_once()
+
+
 def get_db():
     """Get database session (dependency for FastAPI)."""
+    ensure_db()
     db = SessionLocal()
     try:
         yield db
@@ -3,7 +3,7 @@
 from enum import Enum
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum as SQLEnum, Float
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum as SQLEnum, Float, Index
 from sqlalchemy.orm import relationship
 from longevity_map.database.base import Base
 
@@ -40,6 +40,11 @@ class Capability(Base):
     problem_mappings = relationship("ProblemCapabilityMapping", back_populates="capability")
     resource_mappings = relationship("CapabilityResourceMapping", back_populates="capability")
     
+    __table_args__ = (
+        # Existing-capability lookups by (name, type) during ingestion
+        Index('ix_capability_name_type', 'name', 'type'),
+    )
+    
     def __repr__(self):
         return f"<Capability(id={self.id}, name='{self.name}', type={self.type})>"
 
@@ -3,7 +3,7 @@
 from enum import Enum
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum as SQLEnum, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum as SQLEnum, Float, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from longevity_map.database.base import Base
 
@@ -36,6 +36,22 @@ class Gap(Base):
     # Relationships
     capability = relationship("Capability", backref="gaps")
     
+    __table_args__ = (
+        # Gap listings are ordered by impact, optionally filtered by priority
+        # or a minimum blocked value; these serve the top-N from the index
+        # instead of sorting every gap
+        Index('ix_gap_priority_impact', priority, impact_score.desc()),
+        Index(
+            'ix_gap_impact_desc',
+            impact_score.desc(),
+            sqlite_where=blocked_research_value.isnot(None),
+            postgresql_where=blocked_research_value.isnot(None)
+        ),
+        # Covers SUM(blocked_research_value) in /stats, which then reads the
+        # index instead of the table
+        Index('ix_gap_blocked_value', blocked_research_value),
+    )
+    
     def __repr__(self):
         return f"<Gap(id={self.id}, capability_id={self.capability_id}, priority={self.priority})>"
 
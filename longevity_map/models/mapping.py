@@ -1,7 +1,7 @@
 """Mapping models connecting problems, capabilities, and resources."""
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from longevity_map.database.base import Base
 
@@ -24,6 +24,11 @@ class ProblemCapabilityMapping(Base):
     
     __table_args__ = (
         UniqueConstraint('problem_id', 'capability_id', name='uq_problem_capability'),
+        # Covers per-capability problem counts (keystone ranking) with an index-only scan
+        Index('ix_pcm_capability_problem', 'capability_id', 'problem_id'),
+        # Required-problem counts per capability (gap analysis); partial on PostgreSQL
+        Index('ix_pcm_capability_required', 'capability_id', 'is_required',
+              postgresql_where=(is_required == 1)),
     )
     
     def __repr__(self):
@@ -47,6 +52,8 @@ class CapabilityResourceMapping(Base):
     
     __table_args__ = (
         UniqueConstraint('capability_id', 'resource_id', name='uq_capability_resource'),
+        # Resource-match existence checks by score (gap analysis)
+        Index('ix_crm_capability_score', 'capability_id', 'match_score'),
     )
     
     def __repr__(self):
@@ -3,7 +3,7 @@
 from enum import Enum
 from datetime import datetime
 from typing import Optional, List
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum as SQLEnum, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum as SQLEnum, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from longevity_map.database.base import Base
 
@@ -40,6 +40,11 @@ class Problem(Base):
     # Relationships
     capability_mappings = relationship("ProblemCapabilityMapping", back_populates="problem")
     
+    __table_args__ = (
+        # Duplicate-item lookups by (source, source_id) during ingestion
+        Index('ix_problem_source_sourceid', 'source', 'source_id'),
+    )
+    
     def __repr__(self):
         return f"<Problem(id={self.id}, title='{self.title[:50]}...')>"
 
@@ -3,7 +3,7 @@
 from enum import Enum
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum as SQLEnum, Float, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum as SQLEnum, Float, Boolean, Index
 from sqlalchemy.orm import relationship
 from longevity_map.database.base import Base
 
@@ -46,6 +46,11 @@ class Resource(Base):
     # Relationships
     capability_mappings = relationship("CapabilityResourceMapping", back_populates="resource")
     
+    __table_args__ = (
+        # Active resources of given types (resource mapping); partial on PostgreSQL
+        Index('ix_resource_active_type', 'is_active', 'type', postgresql_where=(is_active == True)),
+    )
+    
     def __repr__(self):
         return f"<Resource(id={self.id}, name='{self.name}', type={self.type})>"
 
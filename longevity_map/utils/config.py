@@ -0,0 +1,110 @@
+"""Loading of the YAML config files, shared by every module that reads them."""
+
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional, Tuple
+import json
+import os
+import threading
+import yaml
+from pathlib import Path
+import logging
+
+# Prefer the LibYAML-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+logger = logging.getLogger(__name__)
+
+_CONFIG_DIR = Path(__file__).parent.parent.parent / "config"
+
+# Parsed configs shared by all modules, keyed by (path, mtime_ns, size) so an
+# edited file is re-read while unchanged files are parsed only once per process
+_CONFIG_CACHE: "OrderedDict[Tuple[str, int, int], Mapping[str, Any]]" = OrderedDict()
+_CONFIG_CACHE_SIZE = 32
+_config_cache_lock = threading.Lock()
+
+
+def _config_sidecar_path(config_path: Path) -> Path:
+    """Path of the JSON cache written next to a YAML config file."""
+    return config_path.with_name(config_path.name + ".json")
+
+
+def _parse_yaml_config(config_path: Path) -> Dict[str, Any]:
+    """Parse a YAML config file."""
+    with open(config_path, 'r') as f:
+        return yaml.load(f, Loader=_YamlLoader) or {}
+
+
+def write_config_sidecar(config_path: Path, config: Optional[Dict[str, Any]] = None) -> bool:
+    """
+    Write the JSON sidecar for a YAML config file.
+    
+    Args:
+        config_path: Path to the YAML config file
+        config: Already parsed config (parsed from config_path if omitted)
+        
+    Returns:
+        True if the sidecar was written, False otherwise (e.g. read-only filesystem)
+    """
+    sidecar_path = _config_sidecar_path(config_path)
+    tmp_path = sidecar_path.with_name(f"{sidecar_path.name}.{os.getpid()}.tmp")
+    try:
+        if config is None:
+            config = _parse_yaml_config(config_path)
+        tmp_path.write_text(json.dumps(config))
+        os.replace(tmp_path, sidecar_path)
+        return True
+    except (OSError, TypeError, ValueError, yaml.YAMLError) as e:
+        logger.debug(f"Could not write config sidecar {sidecar_path}: {e}")
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        return False
+
+
+def _read_config_file(config_path: Path, config_mtime_ns: int) -> Dict[str, Any]:
+    """Read a config file, preferring its JSON sidecar when it is up to date."""
+    sidecar_path = _config_sidecar_path(config_path)
+    try:
+        if sidecar_path.stat().st_mtime_ns >= config_mtime_ns:
+            return json.loads(sidecar_path.read_bytes())
+    except (OSError, ValueError):
+        pass  # Missing or unreadable sidecar, fall back to YAML
+    
+    config = _parse_yaml_config(config_path)
+    write_config_sidecar(config_path, config)
+    return config
+
+
+def load_config(config_path: Path) -> Mapping[str, Any]:
+    """Load a YAML config file, reusing the parsed result while the file is unchanged."""
+    stat = config_path.stat()
+    key = (str(config_path.resolve()), stat.st_mtime_ns, stat.st_size)
+    
+    with _config_cache_lock:
+        cached = _CONFIG_CACHE.get(key)
+        if cached is not None:
+            _CONFIG_CACHE.move_to_end(key)
+            return cached
+    
+    # Read-only view: the parsed dict is shared between agents
+    config = MappingProxyType(_read_config_file(config_path, stat.st_mtime_ns))
+    
+    with _config_cache_lock:
+        _CONFIG_CACHE[key] = config
+        while len(_CONFIG_CACHE) > _CONFIG_CACHE_SIZE:
+            _CONFIG_CACHE.popitem(last=False)
+    
+    return config
+
+
+def default_config_path() -> Path:
+    """config/config.yaml, or the bundled example config when it doesn't exist."""
+    config_path = _CONFIG_DIR / "config.yaml"
+    if not config_path.exists():
+        config_path = _CONFIG_DIR / "config.example.yaml"
+    return config_path
@@ -0,0 +1,172 @@
+"""Persistent on-disk cache of text embeddings."""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+from pathlib import Path
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+
+# numpy is optional - only needed if sentence-transformers is available
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# SQLite limits the number of bound parameters per statement
+_QUERY_CHUNK_SIZE = 500
+
+
+def content_hash(text: str, model_name: str = "") -> bytes:
+    """Hash of the text an embedding was computed from, scoped to the model."""
+    return hashlib.blake2b(f"{model_name}\0{text}".encode("utf-8"), digest_size=16).digest()
+
+
+def default_cache_path() -> Path:
+    """Default embedding cache location, next to the default SQLite database."""
+    # For Vercel/serverless, use /tmp directory (writable in serverless)
+    if os.environ.get("VERCEL") or os.environ.get("AWS_LAMBDA_FUNCTION_NAME"):
+        return Path("/tmp/longevity_map_embeddings.db")
+    return Path("data/embedding_cache.db")
+
+
+def default_store_path() -> Path:
+    """Default location of the packed embedding matrix snapshot."""
+    return default_cache_path().with_name("embedding_store.npz")
+
+
+def save_embedding_store(path: Path, ids, hashes: List[bytes], embeddings) -> None:
+    """
+    Write a packed embedding matrix snapshot, replacing any previous one atomically.
+    
+    Args:
+        path: .npz file to write
+        ids: Resource ids, one per row
+        hashes: Content hashes, one per row
+        embeddings: (N, D) matrix of L2-normalized embeddings
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        np.savez(
+            f,
+            ids=np.asarray(ids, dtype=np.int64),
+            # Raw bytes, since fixed-width "S" strings would strip trailing NULs
+            hashes=np.frombuffer(b"".join(hashes), dtype=np.uint8).reshape(len(hashes), -1),
+            embeddings=np.ascontiguousarray(embeddings, dtype=np.float32)
+        )
+    os.replace(tmp_path, path)
+
+
+def load_embedding_store(path: Path) -> Optional[Tuple[List[int], List[bytes], "np.ndarray"]]:
+    """
+    Read a packed embedding matrix snapshot.
+    
+    Args:
+        path: .npz file written by save_embedding_store
+    
+    Returns:
+        (ids, hashes, embeddings) or None if there is no usable snapshot
+    """
+    try:
+        with np.load(path) as store:
+            ids = store["ids"].tolist()
+            hashes = [row.tobytes() for row in store["hashes"]]
+            embeddings = np.ascontiguousarray(store["embeddings"], dtype=np.float32)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Could not read embedding store {path}: {e}")
+        return None
+    
+    if not (len(ids) == len(hashes) == len(embeddings)):
+        logger.warning(f"Ignoring inconsistent embedding store {path}")
+        return None
+    return ids, hashes, embeddings
+
+
+class EmbeddingCache:
+    """Stores one embedding per resource, invalidated when its content hash changes."""
+    
+    def __init__(self, path: Optional[Path] = None, model_name: str = ""):
+        """
+        Open (or create) the cache file.
+        
+        Args:
+            path: SQLite file to store embeddings in
+            model_name: Embedding model name, mixed into content hashes so
+                switching models never returns stale vectors
+        """
+        self.path = Path(path) if path is not None else default_cache_path()
+        self.model_name = model_name
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "resource_id INTEGER PRIMARY KEY, "
+            "content_hash BLOB NOT NULL, "
+            "vector BLOB NOT NULL)"
+        )
+        self._conn.commit()
+    
+    def content_hash(self, text: str) -> bytes:
+        """Hash of the text an embedding was computed from."""
+        return content_hash(text, self.model_name)
+    
+    def get_many(self, keys: Iterable[Tuple[int, bytes]]) -> Dict[int, "np.ndarray"]:
+        """
+        Look up cached embeddings.
+        
+        Args:
+            keys: (resource_id, content_hash) pairs
+        
+        Returns:
+            Dict of resource_id -> embedding for entries whose hash still matches
+        """
+        wanted = dict(keys)
+        found = {}
+        ids = list(wanted)
+        
+        with self._lock:
+            for i in range(0, len(ids), _QUERY_CHUNK_SIZE):
+                chunk = ids[i:i + _QUERY_CHUNK_SIZE]
+                rows = self._conn.execute(
+                    f"SELECT resource_id, content_hash, vector FROM embeddings "
+                    f"WHERE resource_id IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                for resource_id, content_hash, vector in rows:
+                    if wanted[resource_id] == content_hash:
+                        found[resource_id] = np.frombuffer(vector, dtype=np.float32)
+        
+        return found
+    
+    def put_many(self, entries: List[Tuple[int, bytes, "np.ndarray"]]):
+        """
+        Store embeddings, replacing any previous entry for the same resource.
+        
+        Args:
+            entries: (resource_id, content_hash, embedding) tuples
+        """
+        if not entries:
+            return
+        
+        rows = [
+            (resource_id, content_hash, np.asarray(vector, dtype=np.float32).tobytes())
+            for resource_id, content_hash, vector in entries
+        ]
+        try:
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (resource_id, content_hash, vector) VALUES (?, ?, ?)",
+                    rows
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not write embedding cache {self.path}: {e}")
@@ -1,15 +1,23 @@
 """LLM utilities using OpenAI GPT API."""
 
 from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
 from openai import OpenAI
-import yaml
+from longevity_map.utils.config import default_config_path, load_config
+from longevity_map.utils.llm_cache import LLMResultCache
 from pathlib import Path
 import json
 import logging
 import os
+import threading
 
 logger = logging.getLogger(__name__)
 
+# Shared helpers keyed by resolved config path (None = default config), so all
+# agents reuse one OpenAI client and its connection pool
+_llm_helpers: Dict[Optional[Path], "LLMHelper"] = {}
+_llm_helpers_lock = threading.Lock()
+
 
 class LLMHelper:
     """Helper class for LLM operations using OpenAI API."""
@@ -17,14 +25,11 @@ class LLMHelper:
     def __init__(self, config_path: Optional[Path] = None):
         """Initialize LLM helper with API key from config."""
         if config_path is None:
-            config_path = Path(__file__).parent.parent.parent / "config" / "config.yaml"
-            if not config_path.exists():
-                config_path = Path(__file__).parent.parent.parent / "config" / "config.example.yaml"
+            config_path = default_config_path()
         
         try:
             if config_path.exists():
-                with open(config_path, 'r') as f:
-                    config = yaml.safe_load(f) or {}
+                config = load_config(config_path)
             else:
                 config = {}
                 import logging
@@ -51,6 +56,21 @@ class LLMHelper:
         # Use GPT-4o (latest model) as default
         self.model = config.get("agents", {}).get("problem_parser", {}).get("model", "gpt-4o")
         self.temperature = config.get("agents", {}).get("problem_parser", {}).get("temperature", 0.3)
+        
+        # Successful extractions are memoized by input text, so re-crawled
+        # abstracts don't cost another API call
+        self._cache_path = config.get("agents", {}).get("problem_parser", {}).get("llm_cache_path")
+        self._cache: Optional[LLMResultCache] = None
+        self._cache_lock = threading.Lock()
+    
+    @property
+    def cache(self) -> LLMResultCache:
+        """Memoized extraction results, opened on first use."""
+        if self._cache is None:
+            with self._cache_lock:
+                if self._cache is None:
+                    self._cache = LLMResultCache(self._cache_path, model_name=self.model)
+        return self._cache
     
     def extract_problem_info(self, text: str) -> Dict[str, Any]:
         """
@@ -65,6 +85,10 @@ class LLMHelper:
         if not self.enabled:
             return {}
         
+        cached = self.cache.get("problem", text)
+        if cached is not None:
+            return cached
+        
         try:
             prompt = f"""Analyze the following research text about aging/longevity and extract:
 1. A clear problem statement (title and description)
@@ -94,12 +118,113 @@ Return JSON format:
             )
             
             result = json.loads(response.choices[0].message.content)
+            if result:
+                self.cache.put("problem", text, result)
             return result
         
         except Exception as e:
             logger.error(f"Error in LLM extraction: {e}")
             return {}
     
+    def extract_problems_batch(self, texts: List[str], batch_size: int = 10,
+                               max_workers: int = 8) -> List[Dict[str, Any]]:
+        """
+        Extract problem information for many texts with few requests.
+        
+        Texts are sent batch_size at a time in a single prompt, with batches
+        submitted concurrently. Texts with a cached result are not sent, and
+        texts missing from a batched response are retried individually with
+        extract_problem_info.
+        
+        Args:
+            texts: Problem descriptions or paper abstracts
+            batch_size: Number of texts per request
+            max_workers: Maximum number of concurrent requests
+            
+        Returns:
+            List of dicts (same shape as extract_problem_info), aligned with texts
+        """
+        if not self.enabled or not texts:
+            return [{} for _ in texts]
+        
+        results: List[Optional[Dict[str, Any]]] = self.cache.get_many("problem", texts)
+        pending = [i for i, result in enumerate(results) if result is None]
+        chunks = [pending[start:start + batch_size] for start in range(0, len(pending), batch_size)]
+        
+        if chunks:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as pool:
+                chunk_results = pool.map(
+                    lambda indices: self._extract_problem_chunk([texts[i] for i in indices]),
+                    chunks
+                )
+                for indices, extracted in zip(chunks, chunk_results):
+                    for i, result in zip(indices, extracted):
+                        results[i] = result
+            self.cache.put_many("problem", [
+                (texts[i], results[i]) for indices in chunks for i in indices if results[i]
+            ])
+        
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            logger.info(f"Retrying {len(missing)} of {len(texts)} texts individually")
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(missing))) as pool:
+                for i, result in zip(missing, pool.map(self.extract_problem_info, [texts[i] for i in missing])):
+                    results[i] = result
+        
+        return results
+    
+    def _extract_problem_chunk(self, texts: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Extract problem information for several texts in one request (None where missing)."""
+        try:
+            numbered_texts = "\n\n".join(
+                f"Text {i}: {text[:2000]}" for i, text in enumerate(texts, 1)
+            )
+            prompt = f"""Analyze each of the following {len(texts)} research texts about aging/longevity and, for each one, extract:
+1. A clear problem statement (title and description)
+2. The primary hallmark of aging it relates to (genomic_instability, telomere_attrition, epigenetic_alterations, loss_of_proteostasis, deregulated_nutrient_sensing, mitochondrial_dysfunction, cellular_senescence, stem_cell_exhaustion, altered_intercellular_communication, or other)
+3. Required capabilities/tools/technologies needed to solve this problem
+
+{numbered_texts}
+
+Return JSON format with one entry per text, using the text's number as "index":
+{{
+    "problems": [
+        {{
+            "index": 1,
+            "title": "Problem title",
+            "description": "Detailed description",
+            "category": "one_of_the_hallmarks",
+            "capabilities": [
+                {{"name": "capability name", "type": "measurement_tool|model_system|dataset|computational_method|software|hardware|protocol|infrastructure", "description": "what it does"}}
+            ]
+        }}
+    ]
+}}"""
+            
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": "You are an expert in aging research and longevity science. Extract structured information from research texts."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=self.temperature,
+                response_format={"type": "json_object"}
+            )
+            
+            result = json.loads(response.choices[0].message.content)
+            extracted: List[Optional[Dict[str, Any]]] = [None] * len(texts)
+            for problem in result.get("problems", []):
+                if not isinstance(problem, dict):
+                    continue
+                index = problem.pop("index", None)
+                if isinstance(index, int) and 1 <= index <= len(texts):
+                    extracted[index - 1] = problem
+            return extracted
+        
+        except Exception as e:
+            logger.error(f"Error in batched LLM extraction: {e}")
+            return [None] * len(texts)
+    
     def extract_capabilities(self, problem_text: str) -> List[Dict[str, Any]]:
         """
         Extract required capabilities from problem description.
@@ -113,6 +238,10 @@ Return JSON format:
         if not self.enabled:
             return []
         
+        cached = self.cache.get("capabilities", problem_text)
+        if cached is not None:
+            return cached
+        
         try:
             prompt = f"""You are an expert in aging research infrastructure. Analyze this research problem and identify ALL specific capabilities (tools, technologies, datasets, methods, equipment) needed to solve it.
 
@@ -161,6 +290,7 @@ Return JSON format with a "capabilities" array:
                 logger.warning(f"No capabilities extracted from LLM for text: {problem_text[:100]}...")
             else:
                 logger.info(f"LLM extracted {len(capabilities)} capabilities")
+                self.cache.put("capabilities", problem_text, capabilities)
             
             return capabilities
         
@@ -264,3 +394,21 @@ Return JSON array with matches (0-1 score):
             logger.error(f"Error in LLM resource matching: {e}")
             return []
 
+
+def get_llm_helper(config_path: Optional[Path] = None) -> LLMHelper:
+    """
+    Get the shared LLMHelper for a config file, creating it on first use.
+    
+    Args:
+        config_path: Path to config file (default config if None)
+        
+    Returns:
+        LLMHelper instance shared by all callers using the same config
+    """
+    key = Path(config_path).resolve() if config_path is not None else None
+    with _llm_helpers_lock:
+        helper = _llm_helpers.get(key)
+        if helper is None:
+            helper = LLMHelper(config_path)
+            _llm_helpers[key] = helper
+    return helper
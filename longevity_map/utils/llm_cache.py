@@ -0,0 +1,154 @@
+"""Memoization of LLM extraction results, in memory and on disk."""
+
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+from pathlib import Path
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+# SQLite limits the number of bound parameters per statement
+_QUERY_CHUNK_SIZE = 500
+
+
+def text_hash(text: str, model_name: str = "") -> bytes:
+    """SHA-256 of whitespace-normalized text, scoped to the model."""
+    normalized = " ".join(text.split())
+    return hashlib.sha256(f"{model_name}\0{normalized}".encode("utf-8")).digest()
+
+
+def default_cache_path() -> Path:
+    """Default LLM result cache location, next to the default SQLite database."""
+    # For Vercel/serverless, use /tmp directory (writable in serverless)
+    if os.environ.get("VERCEL") or os.environ.get("AWS_LAMBDA_FUNCTION_NAME"):
+        return Path("/tmp/longevity_map_llm_cache.db")
+    return Path("data/llm_cache.db")
+
+
+class LLMResultCache:
+    """
+    Caches JSON-serializable LLM results by kind and input text.
+    
+    Recent results are kept in an in-process LRU; all results are also
+    written to a SQLite side-table so they survive restarts. Results are
+    stored as JSON and decoded on every hit, so callers get their own copy.
+    """
+    
+    def __init__(self, path: Optional[Path] = None, model_name: str = "", maxsize: int = 50_000):
+        """
+        Open (or create) the cache file.
+        
+        Args:
+            path: SQLite file to store results in
+            model_name: LLM model name, mixed into text hashes so switching
+                models never returns another model's output
+            maxsize: Maximum number of results kept in memory
+        """
+        self.path = Path(path) if path is not None else default_cache_path()
+        self.model_name = model_name
+        self.maxsize = maxsize
+        
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[tuple, str]" = OrderedDict()
+        self._conn = None
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_results ("
+                "kind TEXT NOT NULL, "
+                "text_hash BLOB NOT NULL, "
+                "result TEXT NOT NULL, "
+                "PRIMARY KEY (kind, text_hash))"
+            )
+            self._conn.commit()
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"LLM result cache {self.path} unavailable, caching in memory only: {e}")
+            self._conn = None
+    
+    def get_many(self, kind: str, texts: Iterable[str]) -> List[Optional[Any]]:
+        """
+        Look up cached results.
+        
+        Args:
+            kind: Result kind, e.g. "problem" or "capabilities"
+            texts: Input texts
+        
+        Returns:
+            List aligned with texts: the cached result, or None on a miss
+        """
+        keys = [(kind, text_hash(text, self.model_name)) for text in texts]
+        found: Dict[tuple, str] = {}
+        
+        with self._lock:
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+            
+            missing = list({key[1] for key in keys if key not in found})
+            if missing and self._conn is not None:
+                try:
+                    for i in range(0, len(missing), _QUERY_CHUNK_SIZE):
+                        chunk = missing[i:i + _QUERY_CHUNK_SIZE]
+                        rows = self._conn.execute(
+                            f"SELECT text_hash, result FROM llm_results "
+                            f"WHERE kind = ? AND text_hash IN ({','.join('?' * len(chunk))})",
+                            [kind, *chunk]
+                        ).fetchall()
+                        for hash_, result in rows:
+                            found[(kind, hash_)] = result
+                            self._remember((kind, hash_), result)
+                except sqlite3.Error as e:
+                    logger.warning(f"Could not read LLM result cache {self.path}: {e}")
+        
+        return [json.loads(found[key]) if key in found else None for key in keys]
+    
+    def get(self, kind: str, text: str) -> Optional[Any]:
+        """Look up one cached result (None on a miss)."""
+        return self.get_many(kind, [text])[0]
+    
+    def put_many(self, kind: str, entries: Iterable[tuple]):
+        """
+        Store results, replacing any previous entry for the same text.
+        
+        Args:
+            kind: Result kind, e.g. "problem" or "capabilities"
+            entries: (text, result) pairs
+        """
+        rows = [
+            (kind, text_hash(text, self.model_name), json.dumps(result))
+            for text, result in entries
+        ]
+        if not rows:
+            return
+        
+        with self._lock:
+            for kind_, hash_, result in rows:
+                self._remember((kind_, hash_), result)
+            if self._conn is None:
+                return
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO llm_results (kind, text_hash, result) VALUES (?, ?, ?)",
+                    rows
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Could not write LLM result cache {self.path}: {e}")
+    
+    def put(self, kind: str, text: str, result: Any):
+        """Store one result."""
+        self.put_many(kind, [(text, result)])
+    
+    def _remember(self, key: tuple, result: str):
+        """Add a result to the in-memory LRU (caller holds the lock)."""
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
@@ -1,12 +1,12 @@
 """LLM-powered conversational search for the platform."""
 
 from typing import List, Dict, Any, Optional
-from longevity_map.utils.llm import LLMHelper
+from longevity_map.utils.llm import get_llm_helper
 from longevity_map.database.session import SessionLocal
 from longevity_map.models.problem import Problem
 from longevity_map.models.capability import Capability
 from longevity_map.models.gap import Gap
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import or_, func
 import logging
 import json
@@ -18,7 +18,7 @@ class LLMSearch:
     """Conversational search powered by GPT-4o."""
     
     def __init__(self, config_path=None):
-        self.llm = LLMHelper(config_path)
+        self.llm = get_llm_helper(config_path)
     
     def search(self, query: str, db: Session) -> Dict[str, Any]:
         """
@@ -241,7 +241,8 @@ Return JSON with relevance scores (0-1):
     
     def _search_gaps(self, query: str, search_terms: Dict[str, Any], db: Session) -> List[Dict[str, Any]]:
         """Search gaps using LLM-enhanced matching."""
-        gaps = db.query(Gap).limit(50).all()
+        # Capabilities are joined in rather than lazy-loaded per gap below
+        gaps = db.query(Gap).options(joinedload(Gap.capability)).limit(50).all()
         
         if not gaps:
             return []
@@ -3,19 +3,17 @@
 import logging
 import sys
 from pathlib import Path
-import yaml
+
+from longevity_map.utils.config import default_config_path, load_config
 
 
 def setup_logging(config_path: Path = None):
     """Setup logging configuration."""
     if config_path is None:
-        config_path = Path(__file__).parent.parent.parent / "config" / "config.yaml"
-        if not config_path.exists():
-            config_path = Path(__file__).parent.parent.parent / "config" / "config.example.yaml"
+        config_path = default_config_path()
     
     try:
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
+        config = load_config(config_path)
         log_config = config.get("logging", {})
         level = log_config.get("level", "INFO")
         log_file = log_config.get("file")
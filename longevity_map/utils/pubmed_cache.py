@@ -0,0 +1,127 @@
+"""Persistent on-disk cache of fetched PubMed records."""
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from pathlib import Path
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# SQLite limits the number of bound parameters per statement
+_QUERY_CHUNK_SIZE = 500
+
+
+def default_cache_path() -> Path:
+    """Default PubMed record cache location, next to the default SQLite database."""
+    # For Vercel/serverless, use /tmp directory (writable in serverless)
+    if os.environ.get("VERCEL") or os.environ.get("AWS_LAMBDA_FUNCTION_NAME"):
+        return Path("/tmp/longevity_map_pubmed_cache.db")
+    return Path("data/pubmed_cache.db")
+
+
+class PubMedRecordCache:
+    """
+    Stores the raw PubmedArticle XML of each fetched record by PMID.
+    
+    PMIDs never change meaning, so repeat crawls only efetch records that are
+    new or whose cached copy is older than max_age. Search results are not
+    cached, since new papers keep appearing.
+    """
+    
+    def __init__(self, path: Optional[Path] = None, max_age: float = 7 * 24 * 3600):
+        """
+        Open (or create) the cache file.
+        
+        Args:
+            path: SQLite file to store records in
+            max_age: Seconds a cached record is served before it is fetched again
+        """
+        self.path = Path(path) if path is not None else default_cache_path()
+        self.max_age = max_age
+        
+        self._lock = threading.Lock()
+        self._conn = None
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS pubmed_records ("
+                "pmid TEXT PRIMARY KEY, "
+                "xml BLOB NOT NULL, "
+                "fetched_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"PubMed record cache {self.path} unavailable, records will not be cached: {e}")
+            self._conn = None
+    
+    def cached_pmids(self, pmids: Iterable[str]) -> Set[str]:
+        """
+        Find which records are cached, without reading them.
+        
+        Args:
+            pmids: PubMed ids
+        
+        Returns:
+            The pmids cached within max_age
+        """
+        return {pmid for (pmid,) in self._query("pmid", pmids)}
+    
+    def get_many(self, pmids: Iterable[str]) -> Dict[str, bytes]:
+        """
+        Look up cached records.
+        
+        Args:
+            pmids: PubMed ids
+        
+        Returns:
+            Dict of pmid -> PubmedArticle XML for records cached within max_age
+        """
+        return dict(self._query("pmid, xml", pmids))
+    
+    def put_many(self, records: Iterable[Tuple[str, bytes]]):
+        """
+        Store records, replacing any previous copy.
+        
+        Args:
+            records: (pmid, PubmedArticle XML) pairs
+        """
+        now = time.time()
+        rows = [(pmid, xml, now) for pmid, xml in records]
+        if self._conn is None or not rows:
+            return
+        
+        with self._lock:
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO pubmed_records (pmid, xml, fetched_at) VALUES (?, ?, ?)",
+                    rows
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Could not write PubMed record cache {self.path}: {e}")
+    
+    def _query(self, columns: str, pmids: Iterable[str]) -> List[tuple]:
+        """Select columns of the records cached within max_age for pmids."""
+        pmids = list(pmids)
+        rows = []
+        if self._conn is None or not pmids:
+            return rows
+        
+        oldest = time.time() - self.max_age
+        with self._lock:
+            try:
+                for i in range(0, len(pmids), _QUERY_CHUNK_SIZE):
+                    chunk = pmids[i:i + _QUERY_CHUNK_SIZE]
+                    rows.extend(self._conn.execute(
+                        f"SELECT {columns} FROM pubmed_records "
+                        f"WHERE fetched_at >= ? AND pmid IN ({','.join('?' * len(chunk))})",
+                        [oldest, *chunk]
+                    ).fetchall())
+            except sqlite3.Error as e:
+                logger.warning(f"Could not read PubMed record cache {self.path}: {e}")
+        
+        return rows
@@ -0,0 +1,109 @@
+"""In-process caching of expensive analysis results between data updates."""
+
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+import threading
+import time
+
+# Bumped whenever new data is written, so cached results computed from older
+# data are never served again in this process
+_data_version = 0
+_data_version_lock = threading.Lock()
+
+
+def data_version() -> int:
+    """Current data version."""
+    return _data_version
+
+
+def bump_data_version():
+    """Invalidate every cached result computed from the current data."""
+    global _data_version
+    with _data_version_lock:
+        _data_version += 1
+
+
+class TTLCache:
+    """
+    Small thread-safe LRU cache whose entries expire after a fixed time.
+    
+    Keys include the data version, so results go stale immediately after an
+    update in this process; the TTL bounds staleness when another process
+    (e.g. a scheduled updater) wrote the data.
+    """
+    
+    def __init__(self, maxsize: int = 128, ttl: float = 300):
+        """
+        Args:
+            maxsize: Maximum number of entries
+            ttl: Seconds an entry stays valid
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for key, computing and storing it on a miss.
+        
+        Args:
+            key: Cache key (the data version is added automatically)
+            compute: Called without arguments to produce the value on a miss
+        
+        Returns:
+            Cached or freshly computed value
+        """
+        version = data_version()
+        entry = self._lookup((key, version))
+        if entry is not None:
+            return entry[1]
+        
+        # Computed outside the lock so slow misses don't block other keys
+        value = compute()
+        self.set(key, value, version)
+        return value
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Return the cached value for key, or default on a miss.
+        
+        Args:
+            key: Cache key (the data version is added automatically)
+            default: Returned when there is no valid entry
+        """
+        entry = self._lookup((key, data_version()))
+        return default if entry is None else entry[1]
+    
+    def set(self, key: Hashable, value: Any, version: Optional[int] = None):
+        """
+        Store a value.
+        
+        Args:
+            key: Cache key
+            value: Value to store
+            version: Data version the value was computed from (default:
+                current); pass the version read before computing so a value
+                built while data changed is never served as current
+        """
+        if version is None:
+            version = data_version()
+        with self._lock:
+            self._entries[(key, version)] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end((key, version))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def _lookup(self, full_key: tuple) -> Optional[tuple]:
+        """Unexpired (expiry, value) entry for a versioned key, or None."""
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry is None or entry[0] <= time.monotonic():
+                return None
+            self._entries.move_to_end(full_key)
+            return entry
+    
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
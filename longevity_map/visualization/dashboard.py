@@ -16,8 +16,6 @@ def create_dashboard():
     """Create interactive Dash dashboard."""
     app = dash.Dash(__name__)
     
-    db = next(SessionLocal())
-    
     app.layout = html.Div([
         html.H1("Longevity R&D Map Dashboard", style={'textAlign': 'center'}),
         
@@ -55,8 +53,7 @@ def create_dashboard():
         [Input('category-filter', 'value')]
     )
     def update_dashboard(category):
-        db = next(SessionLocal())
-        try:
+        with SessionLocal() as db:
             category_enum = ProblemCategory(category) if category != 'all' else None
             
             fig1 = create_category_distribution(db)
@@ -64,8 +61,6 @@ def create_dashboard():
             fig3 = create_gap_priority_chart(db)
             
             return fig1, fig2, fig3
-        finally:
-            db.close()
     
     return app
 
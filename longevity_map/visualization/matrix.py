@@ -3,8 +3,9 @@
 import plotly.graph_objects as go
 import plotly.express as px
 import pandas as pd
+from collections import defaultdict
 from typing import List, Dict, Any
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from longevity_map.database.session import SessionLocal
 from longevity_map.models.problem import Problem, ProblemCategory
 from longevity_map.models.mapping import ProblemCapabilityMapping
@@ -22,14 +23,21 @@ def create_problem_capability_heatmap(db: Session, category: ProblemCategory = N
     problem_ids = [p.id for p in problems]
     problem_titles = [p.title[:50] for p in problems]  # Truncate for display
     
-    # Get all capabilities
+    # All mappings for these problems in one query, with their capabilities
+    # loaded by a single IN query instead of lazily per mapping
+    mapping_query = db.query(ProblemCapabilityMapping).options(
+        selectinload(ProblemCapabilityMapping.capability)
+    )
+    if category:
+        mapping_query = mapping_query.join(
+            Problem, Problem.id == ProblemCapabilityMapping.problem_id
+        ).filter(Problem.category == category)
+    
+    scores_by_problem = defaultdict(dict)
     all_capabilities = set()
-    for problem in problems:
-        mappings = db.query(ProblemCapabilityMapping).filter(
-            ProblemCapabilityMapping.problem_id == problem.id
-        ).all()
-        for mapping in mappings:
-            all_capabilities.add((mapping.capability_id, mapping.capability.name))
+    for mapping in mapping_query:
+        scores_by_problem[mapping.problem_id][mapping.capability_id] = mapping.confidence_score
+        all_capabilities.add((mapping.capability_id, mapping.capability.name))
     
     capability_ids = [cap_id for cap_id, _ in sorted(all_capabilities)]
     capability_names = [name[:50] for _, name in sorted(all_capabilities)]
@@ -37,15 +45,8 @@ def create_problem_capability_heatmap(db: Session, category: ProblemCategory = N
     # Build matrix data
     matrix_data = []
     for problem_id in problem_ids:
-        row = []
-        mappings = db.query(ProblemCapabilityMapping).filter(
-            ProblemCapabilityMapping.problem_id == problem_id
-        ).all()
-        mapping_dict = {m.capability_id: m.confidence_score for m in mappings}
-        
-        for cap_id in capability_ids:
-            row.append(mapping_dict.get(cap_id, 0.0))
-        matrix_data.append(row)
+        mapping_dict = scores_by_problem.get(problem_id, {})
+        matrix_data.append([mapping_dict.get(cap_id, 0.0) for cap_id in capability_ids])
     
     # Create heatmap
     fig = go.Figure(data=go.Heatmap(
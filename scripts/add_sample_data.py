@@ -13,6 +13,7 @@ from longevity_map.models.mapping import ProblemCapabilityMapping, CapabilityRes
 from longevity_map.agents.problem_parser import ProblemParser
 from longevity_map.agents.capability_extractor import CapabilityExtractor
 from longevity_map.agents.gap_analyzer import GapAnalyzer
+from sqlalchemy import exists
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -106,9 +107,9 @@ def add_sample_data():
                 problem.source_url = sample["source_url"]
             
             # Check if exists
-            existing = db.query(Problem).filter(
+            existing = db.query(exists().where(
                 Problem.source_id == problem.source_id
-            ).first()
+            )).scalar()
             
             if existing:
                 continue
@@ -173,9 +174,9 @@ def add_sample_data():
         
         resources_added = 0
         for res_data in sample_resources:
-            existing = db.query(Resource).filter(
+            existing = db.query(exists().where(
                 Resource.name == res_data["name"]
-            ).first()
+            )).scalar()
             
             if existing:
                 continue
@@ -194,12 +195,11 @@ def add_sample_data():
         capabilities = db.query(Capability).all()
         
         gaps_created = 0
-        for capability in capabilities:
-            gap = gap_analyzer.process(capability, db)
+        for capability, gap in zip(capabilities, gap_analyzer.process_batch(capabilities, db)):
             if gap:
-                existing = db.query(Gap).filter(
+                existing = db.query(exists().where(
                     Gap.capability_id == capability.id
-                ).first()
+                )).scalar()
                 
                 if not existing:
                     db.add(gap)
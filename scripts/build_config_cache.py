@@ -0,0 +1,17 @@
+"""Pre-build the JSON sidecar caches for config files (run as a build step)."""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from longevity_map.utils.config import write_config_sidecar
+
+config_dir = Path(__file__).parent.parent / "config"
+
+for config_path in (config_dir / "config.yaml", config_dir / "config.example.yaml"):
+    if not config_path.exists():
+        continue
+    if write_config_sidecar(config_path):
+        print(f"✅ Wrote {config_path.name}.json")
+    else:
+        print(f"❌ Could not write sidecar for {config_path.name}")
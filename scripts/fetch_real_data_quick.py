@@ -15,6 +15,7 @@ from datetime import datetime, timedelta
 import logging
 import time
 from sqlalchemy.exc import OperationalError
+from sqlalchemy import exists
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -102,10 +103,10 @@ def fetch_and_process_quick():
                 logger.info(f"  URL: https://pubmed.ncbi.nlm.nih.gov/{paper['id']}")
                 
                 # Check if already exists
-                existing = db.query(Problem).filter(
+                existing = db.query(exists().where(
                     Problem.source == "pubmed",
                     Problem.source_id == paper['id']
-                ).first()
+                )).scalar()
                 
                 if existing:
                     logger.info("  [SKIP] Already exists in database")
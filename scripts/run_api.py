@@ -7,14 +7,10 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-import yaml
+from longevity_map.utils.config import default_config_path, load_config
 
-config_path = Path(__file__).parent.parent / "config" / "config.yaml"
-if not config_path.exists():
-    config_path = Path(__file__).parent.parent / "config" / "config.example.yaml"
-
-with open(config_path, 'r') as f:
-    config = yaml.safe_load(f)
+# Also writes the JSON sidecar the API workers then load instead of the YAML
+config = load_config(default_config_path())
 
 api_config = config.get("api", {})
 
@@ -0,0 +1,79 @@
+"""Tests for pattern-based capability extraction."""
+
+import random
+import re
+
+import pytest
+
+from longevity_map.agents.capability_extractor import CapabilityExtractor, _CapabilityHit
+from longevity_map.models.capability import CapabilityType
+
+
+@pytest.fixture(scope="module")
+def extractor():
+    return CapabilityExtractor()
+
+
+def _per_pattern_hits(extractor, text):
+    """Reference extraction: every pattern scanned on its own, as before fusing."""
+    hits = []
+    for cap_type, patterns in extractor.capability_patterns.items():
+        for pattern in patterns:
+            for match in re.finditer(pattern, text):
+                start = max(0, match.start() - 50)
+                end = min(len(text), match.end() + 50)
+                name = extractor._extract_capability_name(text[start:end], match.group())
+                if name and len(name) > 3:
+                    hits.append(_CapabilityHit(name, cap_type, start, end))
+    return hits
+
+
+def _substring_dedup(hits):
+    """Reference deduplication: drop names containing or contained in a kept name."""
+    unique = []
+    seen_names = []
+    for hit in hits:
+        name = hit.name.lower()
+        if not any(name in seen or seen in name for seen in seen_names):
+            unique.append(hit)
+            seen_names.append(name)
+    return unique
+
+
+@pytest.mark.parametrize("text", [
+    # "machine learning" (computational method) overlaps "machine" (hardware)
+    "We trained a machine learning pipeline and flow cytometry protocol.",
+    # "measurement method" (measurement tool) overlaps "method" (protocol)
+    "A new measurement method is needed for senescent cells.",
+    # "public dataset" (dataset) sits next to "platform" (software)
+    "Deposit results in a public dataset on an open platform.",
+    "Mass spectrometry instrument and imaging software for organoids in a mouse model.",
+])
+def test_fused_patterns_match_per_pattern_scan(extractor, text):
+    text = text.lower()
+    assert set(extractor._find_capabilities(text)) == set(_per_pattern_hits(extractor, text))
+
+
+@pytest.mark.parametrize("text", [
+    # Names cut from fixed windows start or end mid-word ("oughput", "scre")
+    "We developed a high-throughput single-cell RNA sequencing platform and a "
+    "mass spectrometry assay to quantify senescent cell burden in aged tissue.",
+    "Clocks estimating biological age; CRISPR screening in organoids and a mouse "
+    "model are needed, with a computational pipeline and machine learning algorithm.",
+    "Flow cytometry and flow cytometry protocol with flow cytometry instrument; "
+    "a cell line, a stem cell line and iPSC organoids in a public dataset database.",
+])
+def test_deduplication_matches_substring_check(extractor, text):
+    hits = extractor._find_capabilities(text.lower())
+    assert extractor._deduplicate_capabilities(hits) == _substring_dedup(hits)
+
+
+def test_deduplication_matches_substring_check_on_random_names(extractor):
+    rng = random.Random(0)
+    text = " ".join(rng.choice(["cell", "line", "mouse", "model", "flow", "cytometry", "assay", "-", ";"])
+                    for _ in range(400))
+    hits = [
+        _CapabilityHit(text[start:start + rng.randint(4, 30)], CapabilityType.OTHER, 0, 0)
+        for start in (rng.randrange(len(text) - 30) for _ in range(500))
+    ]
+    assert extractor._deduplicate_capabilities(hits) == _substring_dedup(hits)
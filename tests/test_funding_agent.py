@@ -0,0 +1,78 @@
+"""Tests for funding attractiveness scoring and ranking."""
+
+import itertools
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from longevity_map.agents import funding_agent
+from longevity_map.agents.funding_agent import FundingAgent
+from longevity_map.database.base import Base, import_models
+from longevity_map.models.gap import Gap, GapPriority
+
+
+@pytest.fixture
+def db():
+    import_models()
+    # One shared connection, so API handlers running in worker threads see the data
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        # Every combination of values on, around and between the bucket edges
+        combinations = itertools.product(
+            [None, 0, 1, 5, 20, 30],                   # num_blocked_problems
+            [None, 0, 1_000_000, 5_000_000, 2.5e7],    # estimated_cost
+            [None, 0, 10_000_000, 100_000_000, 5e8],   # blocked_research_value
+            [None, 0, 12, 24, 36],                     # estimated_time
+        )
+        for i, (num_blocked, cost, value, time) in enumerate(combinations):
+            session.add(Gap(
+                capability_id=1,
+                num_blocked_problems=num_blocked,
+                estimated_cost=cost,
+                blocked_research_value=value,
+                estimated_time=time,
+                priority=GapPriority.LOW,
+                impact_score=(i % 7) / 7
+            ))
+        session.commit()
+        yield session
+    engine.dispose()
+
+
+@pytest.mark.parametrize("numpy_available", [True, False])
+def test_sql_ranking_matches_python_scores(db, monkeypatch, numpy_available):
+    if numpy_available and not funding_agent.NUMPY_AVAILABLE:
+        pytest.skip("numpy not installed")
+    monkeypatch.setattr(funding_agent, "NUMPY_AVAILABLE", numpy_available)
+    agent = FundingAgent()
+    
+    gaps = db.query(Gap).all()
+    scores = {
+        prediction["gap_id"]: prediction["attractiveness_score"]
+        for prediction in agent.predict_funding_attractiveness_batch(gaps, db)
+    }
+    expected = sorted(gaps, key=lambda g: (-scores[g.id], -g.impact_score, g.id))
+    
+    ranked = agent.rank_gaps_by_funding_potential(db, top_n=len(gaps))
+    assert [r["gap"]["id"] for r in ranked] == [g.id for g in expected]
+
+
+def test_funding_potential_endpoint_serves_sql_ranking(db):
+    from fastapi.testclient import TestClient
+    from longevity_map.api import main
+    from longevity_map.database.session import get_db
+    
+    main.app.dependency_overrides[get_db] = lambda: db
+    main.analysis_cache.clear()
+    try:
+        response = TestClient(main.app).get("/gaps/funding-potential", params={"top_n": 10})
+    finally:
+        main.app.dependency_overrides.pop(get_db)
+        main.analysis_cache.clear()
+    
+    assert response.status_code == 200
+    ranked = FundingAgent().rank_gaps_by_funding_potential(db, top_n=10)
+    assert [g["gap_id"] for g in response.json()["gaps"]] == [r["gap_id"] for r in ranked]